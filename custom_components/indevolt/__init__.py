@@ -1,484 +1,729 @@
-from __future__ import annotations
-import logging
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall
-from homeassistant.exceptions import ConfigEntryNotReady
-import voluptuous as vol
-from homeassistant.helpers import config_validation as cv
-from .const import DOMAIN, PLATFORMS, DEFAULT_MAX_CHARGE_POWER, DEFAULT_MAX_DISCHARGE_POWER
-from .coordinator import IndevoltCoordinator
-
-_LOGGER = logging.getLogger(__name__)
-
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Indevolt from a config entry."""
-    hass.data.setdefault(DOMAIN, {})
-    try:
-        coordinator = IndevoltCoordinator(hass, entry)
-        await coordinator.async_config_entry_first_refresh()
-        hass.data[DOMAIN][entry.entry_id] = coordinator
-        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
-        
-        # Register services only once
-        if len(hass.data[DOMAIN]) == 1:
-            await async_register_services(hass)
-        return True
-    except Exception as err:
-        _LOGGER.exception("Unexpected error occurred while setting up Indevolt")
-        raise ConfigEntryNotReady from err
-
-async def async_register_services(hass: HomeAssistant) -> None:
-    """Register integration-level services with device selection."""
-    
-    def get_coordinator_by_device_id(device_id: str | None) -> IndevoltCoordinator:
-        """Get coordinator by device_id or return main device."""
-        if device_id:
-            # Try to find coordinator by device_id
-            for coord in hass.data[DOMAIN].values():
-                if coord.config_entry.entry_id == device_id:
-                    return coord
-            raise ValueError(f"Device with ID {device_id} not found")
-        
-        # Return main device if no device_id specified
-        for coord in hass.data[DOMAIN].values():
-            if coord.config_entry.options.get("is_main_device", False):
-                return coord
-        
-        # Fallback to first device if no main device set
-        return list(hass.data[DOMAIN].values())[0]
-    
-    def get_all_coordinators() -> list[IndevoltCoordinator]:
-        """Get all coordinators."""
-        return list(hass.data[DOMAIN].values())
-
-    # --- Power Control Services ---
-    async def charge(call: ServiceCall):
-        """Charge battery with virtual Min-SOC protection."""
-        device_id = call.data.get("device_id")
-        power = call.data["power"]
-        soc_limit = call.data.get("soc_limit", 100)
-        
-        coord = get_coordinator_by_device_id(device_id)
-        
-        # Check virtual Min-SOC
-        virtual_min_soc = coord.config_entry.options.get("virtual_min_soc", 10)
-        current_soc = coord.data.get("6002")  # Total Battery SOC
-        
-        if current_soc is not None and current_soc <= virtual_min_soc:
-            _LOGGER.warning(
-                "Charging blocked: Current SOC (%s%%) at or below virtual Min-SOC (%s%%)",
-                current_soc, virtual_min_soc
-            )
-            return
-        
-        # Get max limits from options
-        max_charge = coord.config_entry.options.get("max_charge_power", DEFAULT_MAX_CHARGE_POWER)
-        try:
-            await coord.api.async_charge(power, soc_limit, max_charge)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send charge command - device may be offline: {e}")
-            raise
-
-    async def discharge(call: ServiceCall):
-        """Discharge battery with virtual Min-SOC protection."""
-        device_id = call.data.get("device_id")
-        power = call.data["power"]
-        soc_limit = call.data.get("soc_limit", 5)
-        
-        coord = get_coordinator_by_device_id(device_id)
-        
-        # Check virtual Min-SOC
-        virtual_min_soc = coord.config_entry.options.get("virtual_min_soc", 10)
-        current_soc = coord.data.get("6002")  # Total Battery SOC
-        
-        if current_soc is not None and current_soc <= virtual_min_soc:
-            _LOGGER.warning(
-                "Discharging blocked: Current SOC (%s%%) at or below virtual Min-SOC (%s%%)",
-                current_soc, virtual_min_soc
-            )
-            return
-        
-        # Get max limits from options
-        max_discharge = coord.config_entry.options.get("max_discharge_power", DEFAULT_MAX_DISCHARGE_POWER)
-        try:
-            await coord.api.async_discharge(power, soc_limit, max_discharge)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send discharge command - device may be offline: {e}")
-            raise
-
-    async def stop(call: ServiceCall):
-        """Stop charging/discharging."""
-        device_id = call.data.get("device_id")
-        coord = get_coordinator_by_device_id(device_id)
-        try:
-            await coord.api.async_stop()
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send stop command - device may be offline: {e}")
-            raise
-
-    # --- Working Mode Services ---
-    async def set_self_consumption_mode(call: ServiceCall):
-        """Sets device to Mode 1 (Self-consumed prioritized)."""
-        device_id = call.data.get("device_id")
-        coord = get_coordinator_by_device_id(device_id)
-        try:
-            await coord.api.async_set_mode(1)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set self-consumption mode - device may be offline: {e}")
-            raise
-
-    async def set_schedule_mode(call: ServiceCall):
-        """Sets device to Mode 5 (Schedule)."""
-        device_id = call.data.get("device_id")
-        coord = get_coordinator_by_device_id(device_id)
-        try:
-            await coord.api.async_set_mode(5)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set schedule mode - device may be offline: {e}")
-            raise
-
-    async def set_realtime_mode(call: ServiceCall):
-        """Sets device to Mode 4 (Real-time control)."""
-        device_id = call.data.get("device_id")
-        coord = get_coordinator_by_device_id(device_id)
-        try:
-            await coord.api.async_set_mode(4)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set realtime mode - device may be offline: {e}")
-            raise
-
-    # --- Backup SOC Service ---
-    async def set_backup_soc(call: ServiceCall):
-        """Set Backup SOC (minimum reserve SOC)."""
-        device_id = call.data.get("device_id")
-        backup_soc = call.data["backup_soc"]
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting Backup SOC to %s%% for device %s",
-            backup_soc,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_backup_soc(backup_soc)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set backup SOC - device may be offline: {e}")
-            raise
-
-    # --- AC Output Power Service ---
-    async def set_ac_output_power(call: ServiceCall):
-        """Set AC Output power."""
-        device_id = call.data.get("device_id")
-        ac_output_power = call.data["ac_output_power"]
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting AC Output power to %s%% for device %s",
-            ac_output_power,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_ac_output_power(ac_output_power)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set AC output power - device may be offline: {e}")
-            raise
-
-    # --- Feed-In Power Service ---
-    async def set_feed_in_power(call: ServiceCall):
-        """Set Feed-In power."""
-        device_id = call.data.get("device_id")
-        feed_in_power = call.data["feed_in_power"]
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting Feed-In power to %s%% for device %s",
-            feed_in_power,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_feed_in_power(feed_in_power)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set feed-in power - device may be offline: {e}")
-            raise
-
-    # --- Grid Charging Service ---
-    async def set_grid_charging(call: ServiceCall):
-        """Enable/Disable Grid Charging."""
-        device_id = call.data.get("device_id")
-        grid_charging_bool = call.data["grid_charging"]
-        grid_charging = 1 if grid_charging_bool else 0
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting Grid Charging to %s%% for device %s",
-            grid_charging,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_grid_charging(grid_charging)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set grid charging - device may be offline: {e}")
-            raise
-
-    # --- Inverter Input Power Service ---
-    async def set_inverter_input_power(call: ServiceCall):
-        """Set Inverter Input power."""
-        device_id = call.data.get("device_id")
-        inverter_input_power = call.data["inverter_input_power"]
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting Inverter Input power to %s%% for device %s",
-            inverter_input_power,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_inverter_input_power(inverter_input_power)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set inverter input power - device may be offline: {e}")
-            raise
-
-    # --- Bypass Socket Service ---
-    async def set_bypass_socket(call: ServiceCall):
-        """Enable/Disable Bypass Socket."""
-        device_id = call.data.get("device_id")
-        bypass_socket_bool = call.data["bypass_socket"]
-        bypass_socket = 1 if bypass_socket_bool else 0
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting Bypass Socket to %s%% for device %s",
-            bypass_socket,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_bypass_socket(bypass_socket)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set bypass socket - device may be offline: {e}")
-            raise
-
-    # --- LED Light Service ---
-    async def set_led_light(call: ServiceCall):
-        """Enable/Disable LED Light."""
-        device_id = call.data.get("device_id")
-        led_light_bool = call.data["led_light"]
-        led_light = 1 if led_light_bool else 0
-
-        coord = get_coordinator_by_device_id(device_id)
-
-        _LOGGER.info(
-            "Setting LED Ligt to %s%% for device %s",
-            led_light,
-            coord.config_entry.entry_id,
-        )
-
-        try:
-            await coord.api.async_set_led_light(led_light)
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to set LED light - device may be offline: {e}")
-            raise
-
-    # --- Cluster Mode Service ---
-    async def cluster_charge(call: ServiceCall):
-        """Charge battery in cluster mode - sends command only to main device."""
-        power = call.data["power"]
-        soc_limit = call.data.get("soc_limit", 100)
-        
-        # Find main device
-        main_coord = None
-        for coord in get_all_coordinators():
-            if coord.config_entry.options.get("is_main_device", False):
-                main_coord = coord
-                break
-        
-        if not main_coord:
-            _LOGGER.error("No main device configured for cluster mode")
-            return
-        
-        # Check virtual Min-SOC on main device
-        virtual_min_soc = main_coord.config_entry.options.get("virtual_min_soc", 10)
-        current_soc = main_coord.data.get("6002")
-        
-        if current_soc is not None and current_soc <= virtual_min_soc:
-            _LOGGER.warning(
-                "Cluster charging blocked: Main device SOC (%s%%) at or below virtual Min-SOC (%s%%)",
-                current_soc, virtual_min_soc
-            )
-            return
-        
-        max_charge = main_coord.config_entry.options.get("max_charge_power", DEFAULT_MAX_CHARGE_POWER)
-        try:
-            await main_coord.api.async_charge(power, soc_limit, max_charge)
-            _LOGGER.info("Cluster charge command sent to main device")
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send cluster charge command - device may be offline: {e}")
-            raise
-
-    async def cluster_discharge(call: ServiceCall):
-        """Discharge battery in cluster mode - sends command only to main device."""
-        power = call.data["power"]
-        soc_limit = call.data.get("soc_limit", 5)
-        
-        # Find main device
-        main_coord = None
-        for coord in get_all_coordinators():
-            if coord.config_entry.options.get("is_main_device", False):
-                main_coord = coord
-                break
-        
-        if not main_coord:
-            _LOGGER.error("No main device configured for cluster mode")
-            return
-        
-        # Check virtual Min-SOC on main device
-        virtual_min_soc = main_coord.config_entry.options.get("virtual_min_soc", 10)
-        current_soc = main_coord.data.get("6002")
-        
-        if current_soc is not None and current_soc <= virtual_min_soc:
-            _LOGGER.warning(
-                "Cluster discharging blocked: Main device SOC (%s%%) at or below virtual Min-SOC (%s%%)",
-                current_soc, virtual_min_soc
-            )
-            return
-        
-        max_discharge = main_coord.config_entry.options.get("max_discharge_power", DEFAULT_MAX_DISCHARGE_POWER)
-        try:
-            await main_coord.api.async_discharge(power, soc_limit, max_discharge)
-            _LOGGER.info("Cluster discharge command sent to main device")
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send cluster discharge command - device may be offline: {e}")
-            raise
-
-    async def cluster_stop(call: ServiceCall):
-        """Stop charging/discharging in cluster mode."""
-        # Find main device
-        main_coord = None
-        for coord in get_all_coordinators():
-            if coord.config_entry.options.get("is_main_device", False):
-                main_coord = coord
-                break
-        
-        if not main_coord:
-            _LOGGER.error("No main device configured for cluster mode")
-            return
-        
-        try:
-            await main_coord.api.async_stop()
-            _LOGGER.info("Cluster stop command sent to main device")
-        except ConnectionError as e:
-            _LOGGER.error(f"Failed to send cluster stop command - device may be offline: {e}")
-            raise
-
-    # Service schemas with device selection
-    device_schema = vol.Schema({
-        vol.Optional("device_id"): cv.string,
-    })
-    
-    charge_schema = device_schema.extend({
-        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
-        vol.Optional("soc_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
-    })
-    
-    discharge_schema = device_schema.extend({
-        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
-        vol.Optional("soc_limit", default=5): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
-    })
-    
-    backup_soc_schema = device_schema.extend({
-        vol.Required("backup_soc"): vol.All(vol.Coerce(int), vol.Range(min=5, max=100)),
-    })
-
-    ac_output_power_schema = device_schema.extend({
-        vol.Required("ac_output_power", default=800): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
-    })
-
-    feed_in_power_schema = device_schema.extend({
-        vol.Required("feed_in_power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
-    })
-
-    grid_charging_schema = device_schema.extend({
-        vol.Required("grid_charging"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
-    })
-
-    inverter_input_power_schema = device_schema.extend({
-        vol.Required("inverter_input_power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
-    })
-
-    bypass_socket_schema = device_schema.extend({
-        vol.Required("bypass_socket"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
-    })
-
-    led_light_schema = device_schema.extend({
-        vol.Required("led_light"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
-    })
-
-    cluster_charge_schema = vol.Schema({
-        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
-        vol.Optional("soc_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
-    })
-    
-    cluster_discharge_schema = vol.Schema({
-        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
-        vol.Optional("soc_limit", default=5): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
-    })
-
-    # Register all services
-    hass.services.async_register(DOMAIN, "charge", charge, schema=charge_schema)
-    hass.services.async_register(DOMAIN, "discharge", discharge, schema=discharge_schema)
-    hass.services.async_register(DOMAIN, "stop", stop, schema=device_schema)
-    
-    hass.services.async_register(DOMAIN, "set_self_consumption_mode", set_self_consumption_mode, schema=device_schema)
-    hass.services.async_register(DOMAIN, "set_schedule_mode", set_schedule_mode, schema=device_schema)
-    hass.services.async_register(DOMAIN, "set_realtime_mode", set_realtime_mode, schema=device_schema)
-    
-    hass.services.async_register(DOMAIN, "set_backup_soc",set_backup_soc, schema=backup_soc_schema)
-    hass.services.async_register(DOMAIN, "set_ac_output_power",set_ac_output_power, schema=ac_output_power_schema)
-    hass.services.async_register(DOMAIN, "set_feed_in_power",set_feed_in_power, schema=feed_in_power_schema)
-    hass.services.async_register(DOMAIN, "set_grid_charging",set_grid_charging, schema=grid_charging_schema)
-    hass.services.async_register(DOMAIN, "set_inverter_input_power",set_inverter_input_power, schema=inverter_input_power_schema)
-    hass.services.async_register(DOMAIN, "set_bypass_socket",set_bypass_socket, schema=bypass_socket_schema)
-    hass.services.async_register(DOMAIN, "set_led_light",set_led_light, schema=led_light_schema)
-    
-    # Cluster mode services
-    hass.services.async_register(DOMAIN, "cluster_charge", cluster_charge, schema=cluster_charge_schema)
-    hass.services.async_register(DOMAIN, "cluster_discharge", cluster_discharge, schema=cluster_discharge_schema)
-    hass.services.async_register(DOMAIN, "cluster_stop", cluster_stop)
-
-async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
-        
-        # Unregister services if this was the last device
-        if not hass.data[DOMAIN]:
-            hass.services.async_remove(DOMAIN, "charge")
-            hass.services.async_remove(DOMAIN, "discharge")
-            hass.services.async_remove(DOMAIN, "stop")
-            hass.services.async_remove(DOMAIN, "set_self_consumption_mode")
-            hass.services.async_remove(DOMAIN, "set_schedule_mode")
-            hass.services.async_remove(DOMAIN, "set_realtime_mode")
-            hass.services.async_remove(DOMAIN, "set_backup_soc")
-            hass.services.async_remove(DOMAIN, "set_ac_output_power")
-            hass.services.async_remove(DOMAIN, "set_feed_in_power")
-            hass.services.async_remove(DOMAIN, "set_grid_charging")
-            hass.services.async_remove(DOMAIN, "set_inverter_input_power")
-            hass.services.async_remove(DOMAIN, "set_bypass_socket")
-            hass.services.async_remove(DOMAIN, "set_led_light")
-
-            hass.services.async_remove(DOMAIN, "cluster_charge")
-            hass.services.async_remove(DOMAIN, "cluster_discharge")
-            hass.services.async_remove(DOMAIN, "cluster_stop")
-    
-    return unload_ok
+from __future__ import annotations
+import logging
+from datetime import timedelta
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, ServiceCall, SupportsResponse
+from homeassistant.exceptions import ConfigEntryNotReady, HomeAssistantError
+import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN, PLATFORMS, PACK_DISCOVERY_INTERVAL, SOC_GUARD_MAX_AGE
+from .coordinator import IndevoltCoordinator
+from .profiles import PROFILE_SCHEMA
+from .metrics import IndevoltMetricsView
+from .proxy import IndevoltRpcView
+from .register_maps import async_get_register_map
+from .utils import get_entry_gen
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up Indevolt from a config entry."""
+    hass.data.setdefault(DOMAIN, {})
+    try:
+        register_map = await async_get_register_map(hass, get_entry_gen(entry))
+        coordinator = IndevoltCoordinator(hass, entry, register_map)
+        await coordinator.async_load_stored_state()
+
+        # Fast path: start from the cached snapshot and poll in the background,
+        # so a slow or offline device doesn't hold up HA startup
+        from_snapshot = coordinator.async_restore_snapshot()
+        if not from_snapshot:
+            await coordinator.async_config_entry_first_refresh()
+
+        hass.data[DOMAIN][entry.entry_id] = coordinator
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+
+        if from_snapshot:
+            entry.async_create_background_task(
+                hass, coordinator.async_probe_and_refresh(), f"{DOMAIN}_first_refresh"
+            )
+
+        # Refresh model/firmware detection (also fills the profile of entries created before it existed)
+        entry.async_create_background_task(hass, coordinator.async_detect_capabilities(), f"{DOMAIN}_detect_capabilities")
+
+        # Apply option changes live instead of reloading the entry
+        entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+        # Worker for commands queued by services called with wait: false
+        entry.async_create_background_task(hass, coordinator.async_run_command_worker(), f"{DOMAIN}_command_worker")
+
+        # Battery pack discovery at startup and on a slow schedule
+        entry.async_create_background_task(hass, coordinator.async_discover_packs(), f"{DOMAIN}_discover_packs")
+        entry.async_on_unload(
+            async_track_time_interval(hass, coordinator.async_discover_packs, timedelta(seconds=PACK_DISCOVERY_INTERVAL))
+        )
+
+        # Backfill statistics for hours recorded in the sample buffer but not yet imported
+        if coordinator.sample_buffer is not None:
+            # Samples since the last periodic flush would otherwise be lost on shutdown
+            async def _async_flush_on_stop(_: Event) -> None:
+                await coordinator.async_flush_stored_state()
+
+            entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_flush_on_stop))
+            entry.async_create_background_task(
+                hass, coordinator.async_backfill_statistics(), f"{DOMAIN}_backfill_statistics"
+            )
+        
+        # Register services only once
+        if len(hass.data[DOMAIN]) == 1:
+            await async_register_services(hass)
+        # Views can't be removed; the proxy answers only for entries with the option enabled
+        if not hass.data.setdefault(f"{DOMAIN}_rpc_view", False):
+            hass.http.register_view(IndevoltRpcView())
+            hass.data[f"{DOMAIN}_rpc_view"] = True
+        if not hass.data.setdefault(f"{DOMAIN}_metrics_view", False):
+            hass.http.register_view(IndevoltMetricsView())
+            hass.data[f"{DOMAIN}_metrics_view"] = True
+        return True
+    except Exception as err:
+        _LOGGER.exception("Unexpected error occurred while setting up Indevolt")
+        raise ConfigEntryNotReady from err
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator; reload only if that isn't possible."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    if coordinator.options_unchanged():
+        # entry.data-only update (capability profile, firmware version), nothing to apply
+        return
+    if not coordinator.async_apply_options():
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    await coordinator.async_request_refresh()
+
+async def async_register_services(hass: HomeAssistant) -> None:
+    """Register integration-level services with device selection."""
+    
+    def get_coordinator_by_device_id(device_id: str | None) -> IndevoltCoordinator:
+        """Get coordinator by device_id or return main device."""
+        if device_id:
+            # Try to find coordinator by device_id
+            for coord in hass.data[DOMAIN].values():
+                if coord.config_entry.entry_id == device_id:
+                    return coord
+            raise ValueError(f"Device with ID {device_id} not found")
+        
+        # Return main device if no device_id specified
+        for coord in hass.data[DOMAIN].values():
+            if coord.config_entry.options.get("is_main_device", False):
+                return coord
+        
+        # Fallback to first device if no main device set
+        return list(hass.data[DOMAIN].values())[0]
+    
+    def get_all_coordinators() -> list[IndevoltCoordinator]:
+        """Get all coordinators."""
+        return list(hass.data[DOMAIN].values())
+
+    async def execute(coord: IndevoltCoordinator, call: ServiceCall, command, *args):
+        """Run a device command now, or hand it to the device's command worker with wait: false."""
+        if call.data.get("wait", True):
+            return await command(*args)
+        coord.async_queue_command(call.service, command, args, call.context)
+        return None
+
+    async def guard_soc(coord: IndevoltCoordinator) -> float:
+        """Total Battery SOC for the virtual Min-SOC guards, re-read if stale; refuses the command if it can't be read."""
+        current_soc = await coord.async_fresh_value("6002", SOC_GUARD_MAX_AGE)
+        if current_soc is None:
+            raise HomeAssistantError(
+                f"Battery SOC of {coord.config_entry.title} could not be refreshed; command not sent"
+            )
+        return current_soc
+
+    def guarded(coord: IndevoltCoordinator, action: str, command, *args):
+        """Wrap a charge/discharge command so the Min-SOC guard runs right before it is sent, also when queued."""
+        async def _run():
+            virtual_min_soc = coord.limits["virtual_min_soc"]
+            current_soc = await guard_soc(coord)
+            if current_soc <= virtual_min_soc:
+                _LOGGER.warning(
+                    "%s blocked: Current SOC (%s%%) at or below virtual Min-SOC (%s%%)",
+                    action, current_soc, virtual_min_soc
+                )
+                raise HomeAssistantError(
+                    f"{action} blocked: SOC {current_soc}% at or below virtual Min-SOC {virtual_min_soc}%"
+                )
+            return await command(*args)
+        return _run
+
+    # --- Power Control Services ---
+    async def charge(call: ServiceCall):
+        """Charge battery with virtual Min-SOC protection."""
+        device_id = call.data.get("device_id")
+        power = call.data["power"]
+        soc_limit = call.data.get("soc_limit", 100)
+        
+        coord = get_coordinator_by_device_id(device_id)
+        
+        # Virtual Min-SOC is checked right before the command is sent
+        # Get max limits from options
+        max_charge = coord.limits["max_charge_power"]
+        try:
+            await execute(coord, call, guarded(coord, "Charging", coord.api.async_charge, power, soc_limit, max_charge))
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send charge command - device may be offline: {e}")
+            raise
+
+    async def discharge(call: ServiceCall):
+        """Discharge battery with virtual Min-SOC protection."""
+        device_id = call.data.get("device_id")
+        power = call.data["power"]
+        soc_limit = call.data.get("soc_limit", 5)
+        
+        coord = get_coordinator_by_device_id(device_id)
+        
+        # Virtual Min-SOC is checked right before the command is sent
+        # Get max limits from options
+        max_discharge = coord.limits["max_discharge_power"]
+        try:
+            await execute(coord, call, guarded(coord, "Discharging", coord.api.async_discharge, power, soc_limit, max_discharge))
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send discharge command - device may be offline: {e}")
+            raise
+
+    async def stop(call: ServiceCall):
+        """Stop charging/discharging."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        try:
+            await execute(coord, call, coord.api.async_stop)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send stop command - device may be offline: {e}")
+            raise
+
+    # --- Working Mode Services ---
+    async def set_self_consumption_mode(call: ServiceCall):
+        """Sets device to Mode 1 (Self-consumed prioritized)."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        try:
+            await execute(coord, call, coord.api.async_set_mode, 1)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set self-consumption mode - device may be offline: {e}")
+            raise
+
+    async def set_schedule_mode(call: ServiceCall):
+        """Sets device to Mode 5 (Schedule)."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        try:
+            await execute(coord, call, coord.api.async_set_mode, 5)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set schedule mode - device may be offline: {e}")
+            raise
+
+    async def set_realtime_mode(call: ServiceCall):
+        """Sets device to Mode 4 (Real-time control)."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        try:
+            await execute(coord, call, coord.api.async_set_mode, 4)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set realtime mode - device may be offline: {e}")
+            raise
+
+    # --- Backup SOC Service ---
+    async def set_backup_soc(call: ServiceCall):
+        """Set Backup SOC (minimum reserve SOC)."""
+        device_id = call.data.get("device_id")
+        backup_soc = call.data["backup_soc"]
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting Backup SOC to %s%% for device %s",
+            backup_soc,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_backup_soc, backup_soc)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set backup SOC - device may be offline: {e}")
+            raise
+
+    # --- AC Output Power Service ---
+    async def set_ac_output_power(call: ServiceCall):
+        """Set AC Output power."""
+        device_id = call.data.get("device_id")
+        ac_output_power = call.data["ac_output_power"]
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting AC Output power to %s%% for device %s",
+            ac_output_power,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_ac_output_power, ac_output_power)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set AC output power - device may be offline: {e}")
+            raise
+
+    # --- Feed-In Power Service ---
+    async def set_feed_in_power(call: ServiceCall):
+        """Set Feed-In power."""
+        device_id = call.data.get("device_id")
+        feed_in_power = call.data["feed_in_power"]
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting Feed-In power to %s%% for device %s",
+            feed_in_power,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_feed_in_power, feed_in_power)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set feed-in power - device may be offline: {e}")
+            raise
+
+    # --- Grid Charging Service ---
+    async def set_grid_charging(call: ServiceCall):
+        """Enable/Disable Grid Charging."""
+        device_id = call.data.get("device_id")
+        grid_charging_bool = call.data["grid_charging"]
+        grid_charging = 1 if grid_charging_bool else 0
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting Grid Charging to %s%% for device %s",
+            grid_charging,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_grid_charging, grid_charging)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set grid charging - device may be offline: {e}")
+            raise
+
+    # --- Inverter Input Power Service ---
+    async def set_inverter_input_power(call: ServiceCall):
+        """Set Inverter Input power."""
+        device_id = call.data.get("device_id")
+        inverter_input_power = call.data["inverter_input_power"]
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting Inverter Input power to %s%% for device %s",
+            inverter_input_power,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_inverter_input_power, inverter_input_power)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set inverter input power - device may be offline: {e}")
+            raise
+
+    # --- Bypass Socket Service ---
+    async def set_bypass_socket(call: ServiceCall):
+        """Enable/Disable Bypass Socket."""
+        device_id = call.data.get("device_id")
+        bypass_socket_bool = call.data["bypass_socket"]
+        bypass_socket = 1 if bypass_socket_bool else 0
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting Bypass Socket to %s%% for device %s",
+            bypass_socket,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_bypass_socket, bypass_socket)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set bypass socket - device may be offline: {e}")
+            raise
+
+    # --- LED Light Service ---
+    async def set_led_light(call: ServiceCall):
+        """Enable/Disable LED Light."""
+        device_id = call.data.get("device_id")
+        led_light_bool = call.data["led_light"]
+        led_light = 1 if led_light_bool else 0
+
+        coord = get_coordinator_by_device_id(device_id)
+
+        _LOGGER.info(
+            "Setting LED Ligt to %s%% for device %s",
+            led_light,
+            coord.config_entry.entry_id,
+        )
+
+        try:
+            await execute(coord, call, coord.api.async_set_led_light, led_light)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to set LED light - device may be offline: {e}")
+            raise
+
+    # --- Settings Profile Service ---
+    async def apply_profile(call: ServiceCall):
+        """Apply a named settings profile, writing only registers that differ."""
+        device_id = call.data.get("device_id")
+        name = call.data["profile"]
+
+        coord = get_coordinator_by_device_id(device_id)
+        profiles = coord.config_entry.options.get("profiles") or {}
+        if name not in profiles:
+            raise ValueError(f"Profile {name} is not defined for device {coord.config_entry.entry_id}")
+        try:
+            settings = PROFILE_SCHEMA(profiles[name])
+        except vol.Invalid as e:
+            raise ValueError(f"Profile {name} is invalid: {e}") from e
+
+        try:
+            result = await execute(coord, call, coord.async_apply_settings, settings)
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to apply profile {name} - device may be offline: {e}")
+            raise
+        if result is None:
+            # Queued (wait: false); the outcome is reported by the indevolt_command_result event
+            return
+
+        _LOGGER.info(
+            "Applied profile %s to device %s: %s change(s) in %s write(s)",
+            name,
+            coord.config_entry.entry_id,
+            len(result["changed"]),
+            result["writes"],
+        )
+        if call.return_response:
+            return {"profile": name, **result}
+
+    # --- Price Optimizer Service ---
+    async def optimize_schedule(call: ServiceCall):
+        """Compute the cheapest charge/discharge plan for the given prices and execute it."""
+        device_id = call.data.get("device_id")
+        prices = call.data["prices"]
+        load = call.data.get("load")
+        slot_minutes = call.data["slot_minutes"]
+        if load is not None and len(load) != len(prices):
+            raise ValueError("load must have one value per price slot")
+
+        coord = get_coordinator_by_device_id(device_id)
+        start = call.data.get("start")
+        if start is None:
+            # Current slot, aligned to the slot length
+            slot_seconds = slot_minutes * 60
+            start = dt_util.utc_from_timestamp(dt_util.utcnow().timestamp() // slot_seconds * slot_seconds)
+
+        try:
+            schedule = await coord.async_optimize_schedule(
+                prices,
+                slot_minutes,
+                dt_util.as_utc(start),
+                load=load,
+                feed_in_price=call.data.get("feed_in_price"),
+                capacity=call.data.get("capacity"),
+                execute=call.data["execute"],
+            )
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to start schedule - device may be offline: {e}")
+            raise
+
+        _LOGGER.info(
+            "Optimized %s slots for device %s: cost %s (idle %s)",
+            len(prices),
+            coord.config_entry.entry_id,
+            schedule["cost"],
+            schedule["baseline_cost"],
+        )
+        if call.return_response:
+            return schedule
+
+    # --- Statistics Backfill Service ---
+    async def backfill_statistics(call: ServiceCall):
+        """Import buffered samples into long-term statistics."""
+        device_id = call.data.get("device_id")
+        since = call.data.get("since")
+
+        coord = get_coordinator_by_device_id(device_id)
+        if coord.sample_buffer is None:
+            _LOGGER.warning("Sample buffer is disabled for device %s", coord.config_entry.entry_id)
+            return
+
+        imported = await coord.async_backfill_statistics(
+            dt_util.as_utc(since).timestamp() if since is not None else None
+        )
+        _LOGGER.info("Imported %s hourly statistics for device %s", imported, coord.config_entry.entry_id)
+
+    # --- High-Resolution Capture Service ---
+    async def capture(call: ServiceCall):
+        """Start a high-resolution capture in the background."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        if coord.capture is not None:
+            _LOGGER.warning("A capture is already running on device %s", coord.config_entry.entry_id)
+            return
+
+        coord.config_entry.async_create_background_task(
+            hass,
+            coord.async_capture(
+                [str(key) for key in call.data["registers"]],
+                call.data["interval"],
+                call.data["duration"],
+                call.data["window"],
+                call.data["export"],
+            ),
+            f"{DOMAIN}_capture",
+        )
+
+    # --- Profiling Service ---
+    async def profile(call: ServiceCall):
+        """Profile the device's polls and entity updates for a while and write the results to the config directory."""
+        device_id = call.data.get("device_id")
+        coord = get_coordinator_by_device_id(device_id)
+        if coord.profile is not None:
+            _LOGGER.warning("A profile is already running on device %s", coord.config_entry.entry_id)
+            return
+
+        result = await coord.async_profile(call.data["duration"], call.data["cprofile"])
+        _LOGGER.info("Profile of device %s written to %s", coord.config_entry.entry_id, ", ".join(result["files"]))
+        if call.return_response:
+            return result
+
+    # --- Cluster Mode Service ---
+    async def cluster_charge(call: ServiceCall):
+        """Charge battery in cluster mode - sends command only to main device."""
+        power = call.data["power"]
+        soc_limit = call.data.get("soc_limit", 100)
+        
+        # Find main device
+        main_coord = None
+        for coord in get_all_coordinators():
+            if coord.config_entry.options.get("is_main_device", False):
+                main_coord = coord
+                break
+        
+        if not main_coord:
+            _LOGGER.error("No main device configured for cluster mode")
+            return
+        
+        # Virtual Min-SOC of the main device is checked right before the command is sent
+        max_charge = main_coord.limits["max_charge_power"]
+        try:
+            await execute(main_coord, call, guarded(main_coord, "Cluster charging", main_coord.api.async_charge, power, soc_limit, max_charge))
+            _LOGGER.info("Cluster charge command sent to main device")
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send cluster charge command - device may be offline: {e}")
+            raise
+
+    async def cluster_discharge(call: ServiceCall):
+        """Discharge battery in cluster mode - sends command only to main device."""
+        power = call.data["power"]
+        soc_limit = call.data.get("soc_limit", 5)
+        
+        # Find main device
+        main_coord = None
+        for coord in get_all_coordinators():
+            if coord.config_entry.options.get("is_main_device", False):
+                main_coord = coord
+                break
+        
+        if not main_coord:
+            _LOGGER.error("No main device configured for cluster mode")
+            return
+        
+        # Virtual Min-SOC of the main device is checked right before the command is sent
+        max_discharge = main_coord.limits["max_discharge_power"]
+        try:
+            await execute(main_coord, call, guarded(main_coord, "Cluster discharging", main_coord.api.async_discharge, power, soc_limit, max_discharge))
+            _LOGGER.info("Cluster discharge command sent to main device")
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send cluster discharge command - device may be offline: {e}")
+            raise
+
+    async def cluster_stop(call: ServiceCall):
+        """Stop charging/discharging in cluster mode."""
+        # Find main device
+        main_coord = None
+        for coord in get_all_coordinators():
+            if coord.config_entry.options.get("is_main_device", False):
+                main_coord = coord
+                break
+        
+        if not main_coord:
+            _LOGGER.error("No main device configured for cluster mode")
+            return
+        
+        try:
+            await execute(main_coord, call, main_coord.api.async_stop)
+            _LOGGER.info("Cluster stop command sent to main device")
+        except ConnectionError as e:
+            _LOGGER.error(f"Failed to send cluster stop command - device may be offline: {e}")
+            raise
+
+    # Service schemas with device selection
+    device_schema = vol.Schema({
+        vol.Optional("device_id"): cv.string,
+    })
+    
+    # Device commands can be queued instead of awaited
+    command_schema = device_schema.extend({
+        vol.Optional("wait", default=True): cv.boolean,
+    })
+
+    charge_schema = command_schema.extend({
+        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+        vol.Optional("soc_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    })
+    
+    discharge_schema = command_schema.extend({
+        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+        vol.Optional("soc_limit", default=5): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    })
+    
+    backup_soc_schema = command_schema.extend({
+        vol.Required("backup_soc"): vol.All(vol.Coerce(int), vol.Range(min=5, max=100)),
+    })
+
+    ac_output_power_schema = command_schema.extend({
+        vol.Required("ac_output_power", default=800): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
+    })
+
+    feed_in_power_schema = command_schema.extend({
+        vol.Required("feed_in_power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
+    })
+
+    grid_charging_schema = command_schema.extend({
+        vol.Required("grid_charging"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
+    })
+
+    inverter_input_power_schema = command_schema.extend({
+        vol.Required("inverter_input_power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2400)),
+    })
+
+    bypass_socket_schema = command_schema.extend({
+        vol.Required("bypass_socket"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
+    })
+
+    led_light_schema = command_schema.extend({
+        vol.Required("led_light"): vol.All(vol.Coerce(int), vol.Range(min=0, max=1)),
+    })
+
+    apply_profile_schema = command_schema.extend({
+        vol.Required("profile"): cv.string,
+    })
+
+    optimize_schedule_schema = device_schema.extend({
+        vol.Required("prices"): vol.All(cv.ensure_list, [vol.Coerce(float)], vol.Length(min=1, max=672)),
+        vol.Optional("slot_minutes", default=15): vol.All(vol.Coerce(int), vol.Range(min=5, max=240)),
+        vol.Optional("start"): cv.datetime,
+        vol.Optional("load"): vol.All(cv.ensure_list, [vol.Coerce(float)]),
+        vol.Optional("feed_in_price"): vol.Coerce(float),
+        vol.Optional("capacity"): vol.All(vol.Coerce(float), vol.Range(min=0.1, max=100)),
+        vol.Optional("execute", default=True): cv.boolean,
+    })
+
+    backfill_statistics_schema = device_schema.extend({
+        vol.Optional("since"): cv.datetime,
+    })
+
+    capture_schema = device_schema.extend({
+        vol.Required("registers"): vol.All(cv.ensure_list, [vol.Coerce(int)], vol.Length(min=1, max=20)),
+        vol.Optional("interval", default=1): vol.All(vol.Coerce(float), vol.Range(min=0.5, max=60)),
+        vol.Optional("duration", default=300): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+        vol.Optional("window", default=60): vol.All(vol.Coerce(float), vol.Range(min=1, max=3600)),
+        vol.Optional("export", default=False): cv.boolean,
+    })
+
+    profile_schema = device_schema.extend({
+        vol.Optional("duration", default=60): vol.All(vol.Coerce(float), vol.Range(min=5, max=600)),
+        vol.Optional("cprofile", default=True): cv.boolean,
+    })
+
+    cluster_stop_schema = vol.Schema({
+        vol.Optional("wait", default=True): cv.boolean,
+    })
+
+    cluster_charge_schema = cluster_stop_schema.extend({
+        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+        vol.Optional("soc_limit", default=100): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    })
+    
+    cluster_discharge_schema = cluster_stop_schema.extend({
+        vol.Required("power"): vol.All(vol.Coerce(int), vol.Range(min=0, max=2000)),
+        vol.Optional("soc_limit", default=5): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
+    })
+
+    # Register all services
+    hass.services.async_register(DOMAIN, "charge", charge, schema=charge_schema)
+    hass.services.async_register(DOMAIN, "discharge", discharge, schema=discharge_schema)
+    hass.services.async_register(DOMAIN, "stop", stop, schema=command_schema)
+    
+    hass.services.async_register(DOMAIN, "set_self_consumption_mode", set_self_consumption_mode, schema=command_schema)
+    hass.services.async_register(DOMAIN, "set_schedule_mode", set_schedule_mode, schema=command_schema)
+    hass.services.async_register(DOMAIN, "set_realtime_mode", set_realtime_mode, schema=command_schema)
+    
+    hass.services.async_register(DOMAIN, "set_backup_soc",set_backup_soc, schema=backup_soc_schema)
+    hass.services.async_register(DOMAIN, "set_ac_output_power",set_ac_output_power, schema=ac_output_power_schema)
+    hass.services.async_register(DOMAIN, "set_feed_in_power",set_feed_in_power, schema=feed_in_power_schema)
+    hass.services.async_register(DOMAIN, "set_grid_charging",set_grid_charging, schema=grid_charging_schema)
+    hass.services.async_register(DOMAIN, "set_inverter_input_power",set_inverter_input_power, schema=inverter_input_power_schema)
+    hass.services.async_register(DOMAIN, "set_bypass_socket",set_bypass_socket, schema=bypass_socket_schema)
+    hass.services.async_register(DOMAIN, "set_led_light",set_led_light, schema=led_light_schema)
+
+    hass.services.async_register(
+        DOMAIN, "apply_profile", apply_profile, schema=apply_profile_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(
+        DOMAIN, "optimize_schedule", optimize_schedule, schema=optimize_schedule_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    hass.services.async_register(DOMAIN, "backfill_statistics", backfill_statistics, schema=backfill_statistics_schema)
+    hass.services.async_register(DOMAIN, "capture", capture, schema=capture_schema)
+    hass.services.async_register(
+        DOMAIN, "profile", profile, schema=profile_schema, supports_response=SupportsResponse.OPTIONAL
+    )
+    
+    # Cluster mode services
+    hass.services.async_register(DOMAIN, "cluster_charge", cluster_charge, schema=cluster_charge_schema)
+    hass.services.async_register(DOMAIN, "cluster_discharge", cluster_discharge, schema=cluster_discharge_schema)
+    hass.services.async_register(DOMAIN, "cluster_stop", cluster_stop, schema=cluster_stop_schema)
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload a config entry."""
+    if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown_schedule()
+        await coordinator.async_flush_stored_state()
+        
+        # Unregister services if this was the last device
+        if not hass.data[DOMAIN]:
+            # Re-read register maps (e.g. an edited override) on the next setup
+            hass.data.pop(f"{DOMAIN}_register_maps", None)
+            hass.services.async_remove(DOMAIN, "charge")
+            hass.services.async_remove(DOMAIN, "discharge")
+            hass.services.async_remove(DOMAIN, "stop")
+            hass.services.async_remove(DOMAIN, "set_self_consumption_mode")
+            hass.services.async_remove(DOMAIN, "set_schedule_mode")
+            hass.services.async_remove(DOMAIN, "set_realtime_mode")
+            hass.services.async_remove(DOMAIN, "set_backup_soc")
+            hass.services.async_remove(DOMAIN, "set_ac_output_power")
+            hass.services.async_remove(DOMAIN, "set_feed_in_power")
+            hass.services.async_remove(DOMAIN, "set_grid_charging")
+            hass.services.async_remove(DOMAIN, "set_inverter_input_power")
+            hass.services.async_remove(DOMAIN, "set_bypass_socket")
+            hass.services.async_remove(DOMAIN, "set_led_light")
+            hass.services.async_remove(DOMAIN, "apply_profile")
+            hass.services.async_remove(DOMAIN, "optimize_schedule")
+            hass.services.async_remove(DOMAIN, "backfill_statistics")
+            hass.services.async_remove(DOMAIN, "capture")
+            hass.services.async_remove(DOMAIN, "profile")
+
+            hass.services.async_remove(DOMAIN, "cluster_charge")
+            hass.services.async_remove(DOMAIN, "cluster_discharge")
+            hass.services.async_remove(DOMAIN, "cluster_stop")
+    
+    return unload_ok
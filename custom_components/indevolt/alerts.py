@@ -0,0 +1,63 @@
+"""Alert register (8100/8101) decoding with precomputed bit tables."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Final, FrozenSet, Iterable, List
+
+ALERT_BITS_PER_REGISTER = 16
+
+@dataclass(frozen=True)
+class AlertBit:
+    key: str  # Alert register
+    bit: int
+    code: str
+    name: str
+
+# The vendor documentation only lists the alert registers, not the meaning of
+# their bits, so bits are named by register and position (e.g. A1.03).
+ALERT_BITS: Final = {
+    key: tuple(
+        AlertBit(key, bit, f"A{number}.{bit:02d}", f"Alert {number} Bit {bit}")
+        for bit in range(ALERT_BITS_PER_REGISTER)
+    )
+    for number, key in ((1, "8100"), (2, "8101"))
+}
+
+# Set bit positions of every byte value; a register is decoded with one lookup per byte
+_BYTE_BITS: Final = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+def decode_bits(value: int) -> FrozenSet[int]:
+    """Return the positions of the set bits of a 16-bit alert register."""
+    return frozenset((*_BYTE_BITS[value & 0xFF], *(bit + 8 for bit in _BYTE_BITS[value >> 8 & 0xFF])))
+
+class AlertDecoder:
+    """Keeps the decoded alert bits; decodes a register only when its raw value changes."""
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = tuple(keys)
+        self._raw: Dict[str, Any] = {}
+        self._active: Dict[str, FrozenSet[int]] = {key: frozenset() for key in self.keys}
+        # Registers whose raw value changed in the last update; entities only write state for these
+        self.changed: FrozenSet[str] = frozenset()
+
+    def update(self, data: Dict[str, Any]) -> FrozenSet[str]:
+        changed = []
+        for key in self.keys:
+            value = data.get(key)
+            if key in self._raw and value == self._raw[key]:
+                continue
+            self._raw[key] = value
+            self._active[key] = decode_bits(int(value)) if isinstance(value, (int, float)) else frozenset()
+            changed.append(key)
+        self.changed = frozenset(changed)
+        return self.changed
+
+    def is_active(self, key: str, bit: int) -> bool:
+        return bit in self._active.get(key, ())
+
+    def active_faults(self) -> List[AlertBit]:
+        """All currently set alert bits, in register/bit order."""
+        return [ALERT_BITS[key][bit] for key in self.keys for bit in sorted(self._active[key])]
+
+    def known(self, key: str) -> bool:
+        """True if the register has been read with a numeric value."""
+        return isinstance(self._raw.get(key), (int, float))
@@ -0,0 +1,87 @@
+"""Bulk import of buffered samples into HA long-term statistics."""
+from __future__ import annotations
+import logging
+from typing import TYPE_CHECKING, Dict, Set
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_import_statistics, statistics_during_period
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+from .const import DOMAIN
+from .sample_buffer import hourly_aggregates
+
+if TYPE_CHECKING:
+    from .coordinator import IndevoltCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+def _compiled_hours(hass: HomeAssistant, statistic_ids: Set[str], since: float, until: float) -> Dict[str, Set[float]]:
+    """Hour starts the recorder already has statistics for (blocking, recorder executor)."""
+    rows = statistics_during_period(
+        hass,
+        dt_util.utc_from_timestamp(since - since % 3600),
+        dt_util.utc_from_timestamp(until),
+        statistic_ids,
+        "hour",
+        None,
+        {"mean"},
+    )
+    return {statistic_id: {row["start"] for row in hours} for statistic_id, hours in rows.items()}
+
+async def async_import_buffered_statistics(
+    hass: HomeAssistant, coordinator: IndevoltCoordinator, since: float, until: float
+) -> int:
+    """Import hourly mean/min/max of buffered samples in [since, until); return the number of hours imported.
+
+    Only hours the recorder has no statistics for are imported, so hours it
+    compiled from recorded states are never overwritten.
+    """
+    aggregates = await hass.async_add_executor_job(
+        lambda: hourly_aggregates(coordinator.sample_buffer.snapshot()(), since, until)
+    )
+
+    registry = er.async_get(hass)
+    entry = coordinator.config_entry
+    sn = entry.data.get("sn", "unknown")
+    descriptions = {desc.key: desc for desc in coordinator.sensor_list()}
+    targets = {}  # key -> (description, entity_id)
+    for key in aggregates:
+        desc = descriptions.get(key)
+        if desc is None or desc.state_class != SensorStateClass.MEASUREMENT:
+            continue
+        entity_id = registry.async_get_entity_id("sensor", DOMAIN, f"{DOMAIN}_{sn}_{entry.entry_id}_{key}")
+        if entity_id is not None:
+            targets[key] = (desc, entity_id)
+    if not targets:
+        return 0
+
+    compiled = await get_instance(hass).async_add_executor_job(
+        _compiled_hours, hass, {entity_id for _, entity_id in targets.values()}, since, until
+    )
+    imported = 0
+    for key, (desc, entity_id) in targets.items():
+        existing = compiled.get(entity_id, set())
+        c = desc.coefficient
+        statistics = [
+            StatisticData(start=dt_util.utc_from_timestamp(hour), mean=mean * c, min=low * c, max=high * c)
+            for hour, mean, low, high in aggregates[key]
+            if hour not in existing
+        ]
+        if not statistics:
+            continue
+        metadata = StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=None,
+            source="recorder",
+            statistic_id=entity_id,
+            unit_of_measurement=desc.native_unit_of_measurement,
+        )
+        # One bulk call per statistic instead of one state write per sample
+        async_import_statistics(hass, metadata, statistics)
+        imported += len(statistics)
+
+    _LOGGER.debug("Imported %d hourly statistics from the sample buffer", imported)
+    return imported
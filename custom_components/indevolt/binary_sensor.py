@@ -0,0 +1,50 @@
+from __future__ import annotations
+import logging
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass, BinarySensorEntity
+from homeassistant.const import EntityCategory
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .alerts import ALERT_BITS, AlertBit
+from .const import DOMAIN
+from .utils import get_device_info
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        IndevoltAlertBinarySensorEntity(coordinator, alert) for key in coordinator.alerts.keys for alert in ALERT_BITS[key]
+    )
+
+class IndevoltAlertBinarySensorEntity(CoordinatorEntity, BinarySensorEntity):
+    """One bit of an alert register."""
+    _attr_has_entity_name = True
+    _attr_device_class = BinarySensorDeviceClass.PROBLEM
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # 32 bits per device; the Active Faults sensor covers them all
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, alert: AlertBit):
+        super().__init__(coordinator)
+        self.alert = alert
+        sn = coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_name = alert.name
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{alert.key}_bit{alert.bit}"
+        self._attr_device_info = get_device_info(coordinator.config_entry)
+        self._attr_extra_state_attributes = {"code": alert.code, "register": alert.key, "bit": alert.bit}
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_entity_keys((self.alert.key,)))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        # Quiet polls don't touch the state machine
+        if self.alert.key in self.coordinator.alerts.changed:
+            super()._handle_coordinator_update()
+
+    @property
+    def is_on(self):
+        if not self.coordinator.alerts.known(self.alert.key):
+            return None
+        return self.coordinator.alerts.is_active(self.alert.key, self.alert.bit)
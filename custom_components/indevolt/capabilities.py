@@ -0,0 +1,48 @@
+"""Model, firmware and register capability detection from a single probe request."""
+from __future__ import annotations
+import logging
+from typing import Any, Dict
+from .indevolt_api import IndevoltAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+# SN, rated output power, rated capacity, DC input voltage 1, EMS/PCS/MODBUS versions.
+# GEN1 (BK1600) answers only the SN of these; GEN2 answers the rating and DC voltage registers too.
+CAPABILITY_PROBE_KEYS = (0, 4, 142, 1600, 1118, 1119, 1127)
+# A GEN2 marker in the answer identifies GEN2; GEN1 is only the fallback when none answered
+GEN2_MARKER_KEYS = ("4", "142", "1600")
+
+MODEL_BY_GEN = {
+    1: "BK1600/BK1600Ultra",
+    2: "SolidFlex/PowerFlex2000",
+}
+
+def build_profile(data: Dict[str, Any]) -> Dict[str, Any] | None:
+    """Build a capability profile from the probe response; None if the device didn't answer with an SN."""
+    serial_number = data.get("0")
+    if not serial_number:
+        return None
+    gen = 2 if any(data.get(key) not in (None, "") for key in GEN2_MARKER_KEYS) else 1
+    return {
+        "sn": str(serial_number),
+        "gen": gen,
+        "model": MODEL_BY_GEN[gen],
+        "fw_version": _version(data.get("1118")),
+        "pcs_version": _version(data.get("1119")),
+        "modbus_version": _version(data.get("1127")),
+        "rated_power": data.get("4"),
+        "rated_capacity": data.get("142"),
+        # Registers the device turned out not to have (learned while polling)
+        "unsupported": [],
+    }
+
+async def async_probe_capabilities(api: IndevoltAPI, timeout: float = 15) -> Dict[str, Any] | None:
+    """Probe the discriminating registers in one request and return the capability profile."""
+    data = await api.fetch_data(list(CAPABILITY_PROBE_KEYS), timeout=timeout)
+    profile = build_profile(data) if data else None
+    if profile:
+        _LOGGER.debug("Detected %s (GEN%s), firmware %s", profile["model"], profile["gen"], profile["fw_version"])
+    return profile
+
+def _version(value) -> str | None:
+    return str(value) if value not in (None, "", 0) else None
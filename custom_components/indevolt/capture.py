@@ -0,0 +1,78 @@
+"""High-resolution capture of a register set with per-window aggregation."""
+from __future__ import annotations
+import math
+from array import array
+from typing import Any, Dict, Iterator, List, Tuple
+
+PERCENTILES = (5, 50, 95)
+
+class CaptureSession:
+    """Samples of a fixed register set, stored in preallocated arrays."""
+
+    def __init__(self, keys: List[str], interval: float, duration: float, window: float):
+        self.keys = keys
+        self.interval = interval
+        self.window = window
+        self.capacity = max(1, int(duration / interval))
+        self.times = array("d", [math.nan]) * self.capacity
+        self.values = {key: array("d", [math.nan]) * self.capacity for key in keys}
+        self.count = 0
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.capacity
+
+    def add(self, ts: float, data: Dict[str, Any]) -> None:
+        """Store one sample; missing or non-numeric registers are kept as NaN."""
+        if self.full:
+            return
+        self.times[self.count] = ts
+        for key in self.keys:
+            value = data.get(key)
+            self.values[key][self.count] = value if isinstance(value, (int, float)) else math.nan
+        self.count += 1
+
+    def samples(self) -> Iterator[Tuple[float, int, float]]:
+        """Iterate (timestamp, register, value) records for export."""
+        for i in range(self.count):
+            for key in self.keys:
+                value = self.values[key][i]
+                if not math.isnan(value):
+                    yield self.times[i], int(key), value
+
+    def summarize(self) -> List[Dict[str, Any]]:
+        """Return min/max/mean/percentiles per register for each window."""
+        windows: List[Dict[str, Any]] = []
+        start_idx = 0
+        while start_idx < self.count:
+            window_start = self.times[start_idx]
+            end_idx = start_idx
+            while end_idx < self.count and self.times[end_idx] < window_start + self.window:
+                end_idx += 1
+
+            window: Dict[str, Any] = {"start": window_start, "samples": end_idx - start_idx}
+            for key in self.keys:
+                window[key] = _stats(self.values[key][start_idx:end_idx])
+            windows.append(window)
+            start_idx = end_idx
+        return windows
+
+def _stats(values: array) -> Dict[str, float] | None:
+    ordered = sorted(v for v in values if not math.isnan(v))
+    if not ordered:
+        return None
+    stats = {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": round(math.fsum(ordered) / len(ordered), 3),
+    }
+    for q in PERCENTILES:
+        stats[f"p{q}"] = round(_percentile(ordered, q), 3)
+    return stats
+
+def _percentile(ordered: List[float], q: float) -> float:
+    """Linear-interpolated percentile of pre-sorted values."""
+    pos = (len(ordered) - 1) * q / 100
+    low = math.floor(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
@@ -1,194 +1,343 @@
-"""Config flow for indevolt integration."""
-from __future__ import annotations
-
-import logging
-import asyncio
-from typing import Any
-import voluptuous as vol
-
-from homeassistant import config_entries
-from homeassistant.core import callback
-from homeassistant.const import CONF_HOST, CONF_PORT, CONF_SCAN_INTERVAL
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers import selector
-
-from .const import (
-    DOMAIN, 
-    DEFAULT_PORT, 
-    DEFAULT_SCAN_INTERVAL, 
-    SUPPORTED_MODELS,
-    DEFAULT_MAX_CHARGE_POWER,
-    DEFAULT_MAX_DISCHARGE_POWER,
-    DEFAULT_VIRTUAL_MIN_SOC
-)
-from .indevolt_api import IndevoltAPI
-from .utils import get_device_gen
-
-_LOGGER = logging.getLogger(__name__)
-
-
-class indevoltConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
-    """Handle a config flow for indevolt."""
-
-    VERSION = 1
-
-    @staticmethod
-    @callback
-    def async_get_options_flow(
-        config_entry: config_entries.ConfigEntry
-    ) -> indevoltOptionsFlowHandler:
-        """Get the options flow for this handler."""
-        return indevoltOptionsFlowHandler()
-
-    async def async_step_user(
-        self, user_input: dict[str, Any] | None = None
-    ) -> config_entries.FlowResult:
-        """Handle the initial step."""
-        errors: dict[str, str] = {}
-        
-        if user_input is not None:
-            host = user_input[CONF_HOST]
-            port = user_input.get(CONF_PORT, DEFAULT_PORT)
-            device_model = user_input["device_model"]
-            scan_interval = user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-
-            # Validate port range
-            if not 1 <= port <= 65535:
-                errors["port"] = "invalid_port"
-            else:
-                api = IndevoltAPI(host, port, async_get_clientsession(self.hass))
-                
-                try:
-                    _LOGGER.debug("Attempting to fetch device SN (key 0) for setup")
-                    data = await api.fetch_data([0])
-                    serial_number = data.get("0")
-
-                    if not serial_number:
-                        raise ConnectionError(
-                            "Could not retrieve serial number from device (key 0)"
-                        )
-                    
-                    device_gen = get_device_gen(device_model)
-                    if device_gen == 1:
-                        fw_version = "V1.3.0A_R006.072_M4848_00000039"
-                    else:
-                        fw_version = "V1.3.09_R00D.012_M4801_00000015"
-                    
-                    await self.async_set_unique_id(str(serial_number))
-                    self._abort_if_unique_id_configured()
-
-                    data_to_save = {
-                        CONF_HOST: host,
-                        CONF_PORT: port,
-                        "device_model": device_model,
-                        "sn": str(serial_number),
-                        "fw_version": fw_version,
-                    }
-                    
-                    options_to_save = {
-                        CONF_SCAN_INTERVAL: scan_interval,
-                        "max_charge_power": DEFAULT_MAX_CHARGE_POWER,
-                        "max_discharge_power": DEFAULT_MAX_DISCHARGE_POWER,
-                        "virtual_min_soc": DEFAULT_VIRTUAL_MIN_SOC,
-                        "is_main_device": False,
-                        "enable_safety_filter": True,  # Default enabled
-                    }
-
-                    return self.async_create_entry(
-                        title=f"indevolt {serial_number}", 
-                        data=data_to_save,
-                        options=options_to_save
-                    )
-
-                except (ConnectionError, asyncio.TimeoutError):
-                    _LOGGER.warning("Failed to connect to indevolt at %s:%s", host, port)
-                    errors["base"] = "cannot_connect"
-                except Exception:
-                    _LOGGER.exception("Unexpected exception during setup")
-                    errors["base"] = "unknown"
-
-        setup_schema = vol.Schema({
-            vol.Required(CONF_HOST): str,
-            vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
-            vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
-            vol.Required("device_model"): vol.In(SUPPORTED_MODELS),
-        })
-        
-        return self.async_show_form(step_id="user", data_schema=setup_schema, errors=errors)
-
-
-class indevoltOptionsFlowHandler(config_entries.OptionsFlow):
-    """Handles options flow for the component."""
-
-    async def async_step_init(
-        self, user_input: dict[str, Any] | None = None
-    ) -> config_entries.FlowResult:
-        """Manage the options."""
-        if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
-
-        device_gen = get_device_gen(self.config_entry.data.get("device_model"))
-        
-        if device_gen == 1:
-            charge_description = "BK1600 Ultra: Max 1200W"
-            discharge_description = "BK1600 Ultra: Max 800W"
-        else:
-            charge_description = "SolidFlex/PowerFlex2000: Max 1200W"
-            discharge_description = "SolidFlex/PowerFlex2000: Max 800W"
-
-        existing_main = False
-        if self.hass.data.get(DOMAIN):
-            for entry_id, coord in self.hass.data[DOMAIN].items():
-                if entry_id != self.config_entry.entry_id:
-                    if coord.config_entry.options.get("is_main_device", False):
-                        existing_main = True
-                        break
-
-        options_schema = vol.Schema({
-            vol.Optional(
-                CONF_SCAN_INTERVAL,
-                default=self.config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
-            ): selector.NumberSelector(
-                selector.NumberSelectorConfig(min=5, max=300, step=1, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX)
-            ),
-            vol.Optional(
-                "max_charge_power",
-                default=self.config_entry.options.get("max_charge_power", DEFAULT_MAX_CHARGE_POWER),
-            ): selector.NumberSelector(
-                selector.NumberSelectorConfig(min=100, max=2000, step=50, unit_of_measurement="W", mode=selector.NumberSelectorMode.BOX)
-            ),
-            vol.Optional(
-                "max_discharge_power",
-                default=self.config_entry.options.get("max_discharge_power", DEFAULT_MAX_DISCHARGE_POWER),
-            ): selector.NumberSelector(
-                selector.NumberSelectorConfig(min=100, max=2000, step=50, unit_of_measurement="W", mode=selector.NumberSelectorMode.BOX)
-            ),
-            vol.Optional(
-                "virtual_min_soc",
-                default=self.config_entry.options.get("virtual_min_soc", DEFAULT_VIRTUAL_MIN_SOC),
-            ): selector.NumberSelector(
-                selector.NumberSelectorConfig(min=0, max=50, step=1, unit_of_measurement="%", mode=selector.NumberSelectorMode.SLIDER)
-            ),
-            vol.Optional(
-                "enable_safety_filter",
-                default=self.config_entry.options.get("enable_safety_filter", True),
-            ): selector.BooleanSelector(),
-            vol.Optional(
-                "is_main_device",
-                default=self.config_entry.options.get("is_main_device", False),
-            ): selector.BooleanSelector(),
-        })
-
-        main_device_info = ""
-        if existing_main:
-            main_device_info = "\n\n⚠️ **Cluster Mode**: Another device is already configured as Main Device."
-        
-        return self.async_show_form(
-            step_id="init", 
-            data_schema=options_schema,
-            description_placeholders={
-                "charge_info": charge_description,
-                "discharge_info": discharge_description,
-                "main_device_warning": main_device_info,
-            }
-        )
+"""Config flow for indevolt integration."""
+from __future__ import annotations
+
+import logging
+import asyncio
+from typing import Any
+import voluptuous as vol
+
+from homeassistant import config_entries
+from homeassistant.core import callback
+from homeassistant.const import CONF_HOST, CONF_PORT, CONF_SCAN_INTERVAL
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import selector
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DOMAIN, 
+    DEFAULT_PORT, 
+    DEFAULT_SCAN_INTERVAL, 
+    SUPPORTED_MODELS,
+    DEFAULT_MAX_CHARGE_POWER,
+    DEFAULT_MAX_DISCHARGE_POWER,
+    DEFAULT_VIRTUAL_MIN_SOC,
+    DEFAULT_SAMPLE_BUFFER_SIZE,
+    DISCOVERY_PARALLELISM,
+    DISCOVERY_TIMEOUT,
+    DISCOVERY_MAX_HOSTS,
+    DISCOVERY_MAX_PROBES,
+)
+from .capabilities import async_probe_capabilities
+from .discovery import async_discover_devices, network_hosts, parse_ports
+from .indevolt_api import IndevoltAPI
+from .profiles import PROFILES_SCHEMA
+from .thresholds import THRESHOLDS_SCHEMA
+from .utils import get_device_gen, get_entry_gen
+
+_LOGGER = logging.getLogger(__name__)
+
+MODEL_AUTO = "auto"
+MODEL_CHOICES = {MODEL_AUTO: "Auto-detect", **{model: model for model in SUPPORTED_MODELS}}
+
+
+class indevoltConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
+    """Handle a config flow for indevolt."""
+
+    VERSION = 1
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry
+    ) -> indevoltOptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return indevoltOptionsFlowHandler()
+
+    def __init__(self) -> None:
+        """Initialize the flow."""
+        self._discovered: dict[str, dict[str, Any]] = {}
+
+    async def async_step_user(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Let the user choose between manual setup and LAN discovery."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discover"])
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Handle manual setup with a known host."""
+        errors: dict[str, str] = {}
+        
+        if user_input is not None:
+            host = user_input[CONF_HOST]
+            port = user_input.get(CONF_PORT, DEFAULT_PORT)
+            device_model = user_input["device_model"]
+            scan_interval = user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+
+            # Validate port range
+            if not 1 <= port <= 65535:
+                errors["port"] = "invalid_port"
+            else:
+                api = IndevoltAPI(host, port, async_get_clientsession(self.hass))
+                
+                try:
+                    _LOGGER.debug("Probing device SN, model and firmware for setup")
+                    profile = await async_probe_capabilities(api)
+
+                    if profile is None:
+                        raise ConnectionError(
+                            "Could not retrieve serial number from device (key 0)"
+                        )
+
+                    await self.async_set_unique_id(profile["sn"])
+                    self._abort_if_unique_id_configured()
+
+                    return self._async_create_device_entry(host, port, profile, device_model, scan_interval)
+
+                except (ConnectionError, asyncio.TimeoutError):
+                    _LOGGER.warning("Failed to connect to indevolt at %s:%s", host, port)
+                    errors["base"] = "cannot_connect"
+                except Exception:
+                    _LOGGER.exception("Unexpected exception during setup")
+                    errors["base"] = "unknown"
+
+        setup_schema = vol.Schema({
+            vol.Required(CONF_HOST): str,
+            vol.Optional(CONF_PORT, default=DEFAULT_PORT): int,
+            vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+            vol.Required("device_model", default=MODEL_AUTO): vol.In(MODEL_CHOICES),
+        })
+        
+        return self.async_show_form(step_id="manual", data_schema=setup_schema, errors=errors)
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Scan a subnet and port range for devices."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                hosts = network_hosts(user_input["network"], DISCOVERY_MAX_HOSTS)
+                ports = parse_ports(user_input["ports"])
+            except ValueError:
+                errors["base"] = "invalid_network"
+            else:
+                # Every host is probed on every port; keep the scan from flooding the LAN
+                if len(hosts) * len(ports) > DISCOVERY_MAX_PROBES:
+                    errors["base"] = "too_many_probes"
+            if not errors:
+                found = await async_discover_devices(
+                    async_get_clientsession(self.hass), hosts, ports, DISCOVERY_PARALLELISM, DISCOVERY_TIMEOUT
+                )
+                configured = self._async_current_ids()
+                self._discovered = {device["sn"]: device for device in found if device["sn"] not in configured}
+                if self._discovered:
+                    return await self.async_step_discover_select()
+                errors["base"] = "no_devices_found"
+
+        discover_schema = vol.Schema({
+            vol.Required("network", default=(user_input or {}).get("network", "192.168.1.0/24")): str,
+            vol.Required("ports", default=(user_input or {}).get("ports", str(DEFAULT_PORT))): str,
+        })
+
+        return self.async_show_form(step_id="discover", data_schema=discover_schema, errors=errors)
+
+    async def async_step_discover_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Let the user pick one or more discovered devices."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            selected = user_input["devices"]
+            if not selected:
+                errors["base"] = "no_device_selected"
+            else:
+                device_model = user_input["device_model"]
+                scan_interval = user_input.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+                # Each device needs its own entry; hand all but the first to separate import flows
+                for sn in selected[1:]:
+                    device = self._discovered[sn]
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data={**device, "device_model": device_model, CONF_SCAN_INTERVAL: scan_interval},
+                        )
+                    )
+                device = self._discovered[selected[0]]
+                await self.async_set_unique_id(device["sn"])
+                self._abort_if_unique_id_configured()
+                return self._async_create_device_entry(
+                    device["host"], device["port"], device["capabilities"], device_model, scan_interval
+                )
+
+        devices = {
+            sn: f"{sn} - {device['capabilities']['model']} ({device['host']}:{device['port']})"
+            for sn, device in self._discovered.items()
+        }
+        select_schema = vol.Schema({
+            vol.Required("devices", default=list(devices)): cv.multi_select(devices),
+            vol.Required("device_model", default=MODEL_AUTO): vol.In(MODEL_CHOICES),
+            vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int,
+        })
+
+        return self.async_show_form(step_id="discover_select", data_schema=select_schema, errors=errors)
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> config_entries.FlowResult:
+        """Create an entry for a device selected in another discovery flow."""
+        await self.async_set_unique_id(import_data["sn"])
+        self._abort_if_unique_id_configured()
+        return self._async_create_device_entry(
+            import_data["host"],
+            import_data["port"],
+            import_data["capabilities"],
+            import_data["device_model"],
+            import_data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+        )
+
+    @callback
+    def _async_create_device_entry(
+        self, host: str, port: int, profile: dict[str, Any], device_model: str, scan_interval: int
+    ) -> config_entries.FlowResult:
+        """Create the config entry for a probed device."""
+        if device_model != MODEL_AUTO:
+            # Explicit choice wins over detection and is kept on later re-detection
+            profile = {**profile, "gen": get_device_gen(device_model), "model": device_model, "model_override": True}
+        serial_number = profile["sn"]
+
+        data_to_save = {
+            CONF_HOST: host,
+            CONF_PORT: port,
+            "device_model": profile["model"],
+            "sn": serial_number,
+            "fw_version": profile["fw_version"],
+            "capabilities": profile,
+        }
+        
+        options_to_save = {
+            CONF_SCAN_INTERVAL: scan_interval,
+            "max_charge_power": DEFAULT_MAX_CHARGE_POWER,
+            "max_discharge_power": DEFAULT_MAX_DISCHARGE_POWER,
+            "virtual_min_soc": DEFAULT_VIRTUAL_MIN_SOC,
+            "is_main_device": False,
+            "enable_safety_filter": True,  # Default enabled
+        }
+
+        return self.async_create_entry(
+            title=f"indevolt {serial_number}", 
+            data=data_to_save,
+            options=options_to_save
+        )
+
+
+class indevoltOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handles options flow for the component."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                PROFILES_SCHEMA(user_input.get("profiles") or {})
+            except vol.Invalid:
+                errors["profiles"] = "invalid_profiles"
+            try:
+                THRESHOLDS_SCHEMA(user_input.get("thresholds") or {})
+            except vol.Invalid:
+                errors["thresholds"] = "invalid_thresholds"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        device_gen = get_entry_gen(self.config_entry)
+        
+        if device_gen == 1:
+            charge_description = "BK1600 Ultra: Max 1200W"
+            discharge_description = "BK1600 Ultra: Max 800W"
+        else:
+            charge_description = "SolidFlex/PowerFlex2000: Max 1200W"
+            discharge_description = "SolidFlex/PowerFlex2000: Max 800W"
+
+        existing_main = False
+        if self.hass.data.get(DOMAIN):
+            for entry_id, coord in self.hass.data[DOMAIN].items():
+                if entry_id != self.config_entry.entry_id:
+                    if coord.config_entry.options.get("is_main_device", False):
+                        existing_main = True
+                        break
+
+        options_schema = vol.Schema({
+            vol.Optional(
+                CONF_SCAN_INTERVAL,
+                default=self.config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=5, max=300, step=1, unit_of_measurement="s", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                "max_charge_power",
+                default=self.config_entry.options.get("max_charge_power", DEFAULT_MAX_CHARGE_POWER),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=100, max=2000, step=50, unit_of_measurement="W", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                "max_discharge_power",
+                default=self.config_entry.options.get("max_discharge_power", DEFAULT_MAX_DISCHARGE_POWER),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=100, max=2000, step=50, unit_of_measurement="W", mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                "virtual_min_soc",
+                default=self.config_entry.options.get("virtual_min_soc", DEFAULT_VIRTUAL_MIN_SOC),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=0, max=50, step=1, unit_of_measurement="%", mode=selector.NumberSelectorMode.SLIDER)
+            ),
+            vol.Optional(
+                "enable_safety_filter",
+                default=self.config_entry.options.get("enable_safety_filter", True),
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                "is_main_device",
+                default=self.config_entry.options.get("is_main_device", False),
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                "enable_rpc_proxy",
+                default=self.config_entry.options.get("enable_rpc_proxy", False),
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                "enable_sample_buffer",
+                default=self.config_entry.options.get("enable_sample_buffer", False),
+            ): selector.BooleanSelector(),
+            vol.Optional(
+                "sample_buffer_size",
+                default=self.config_entry.options.get("sample_buffer_size", DEFAULT_SAMPLE_BUFFER_SIZE),
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(min=10000, max=1000000, step=10000, mode=selector.NumberSelectorMode.BOX)
+            ),
+            vol.Optional(
+                "profiles",
+                default=self.config_entry.options.get("profiles", {}),
+            ): selector.ObjectSelector(),
+            vol.Optional(
+                "thresholds",
+                default=self.config_entry.options.get("thresholds", {}),
+            ): selector.ObjectSelector(),
+        })
+
+        main_device_info = ""
+        if existing_main:
+            main_device_info = "\n\n⚠️ **Cluster Mode**: Another device is already configured as Main Device."
+        
+        return self.async_show_form(
+            step_id="init", 
+            data_schema=options_schema,
+            errors=errors,
+            description_placeholders={
+                "charge_info": charge_description,
+                "discharge_info": discharge_description,
+                "main_device_warning": main_device_info,
+            }
+        )
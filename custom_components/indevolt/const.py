@@ -1,18 +1,64 @@
-from homeassistant.const import Platform
-
-DOMAIN = "indevolt"
-DEFAULT_PORT = 8080
-DEFAULT_SCAN_INTERVAL = 30
-DEFAULT_MAX_CHARGE_POWER = 1200
-DEFAULT_MAX_DISCHARGE_POWER = 800
-DEFAULT_VIRTUAL_MIN_SOC = 8
-PLATFORMS = [
-    Platform.SENSOR
-]
-
-SUPPORTED_MODELS = [
-    "BK1600/BK1600Ultra",
-    "SolidFlex/PowerFlex2000"
-]
-
-
+from homeassistant.const import Platform
+
+DOMAIN = "indevolt"
+DEFAULT_PORT = 8080
+DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MAX_CHARGE_POWER = 1200
+DEFAULT_MAX_DISCHARGE_POWER = 800
+DEFAULT_VIRTUAL_MIN_SOC = 8
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 300
+INTEGRATION_MAX_GAP = 300
+DEFAULT_SAMPLE_BUFFER_SIZE = 100000
+SAMPLE_FLUSH_INTERVAL = 300
+PROBE_TIMEOUT = 3
+SNAPSHOT_MAX_AGE = 86400
+PACK_DISCOVERY_INTERVAL = 21600
+DISCOVERY_PARALLELISM = 32
+DISCOVERY_TIMEOUT = 1.5
+DISCOVERY_MAX_HOSTS = 1024
+# Maximum hosts × ports probed by one scan
+DISCOVERY_MAX_PROBES = 2048
+MISSING_KEY_POLLS = 3
+ESTIMATE_WINDOW = 40
+COMMAND_QUEUE_SIZE = 20
+REQUEST_RATE = 5.0
+REQUEST_BURST = 5
+PROXY_CACHE_SIZE = 1000
+PLAUSIBILITY_WINDOW = 5
+SLOW_TIER_POLLS = 10
+# Oldest SOC sample the charge/discharge guards act on; older values are re-read first
+SOC_GUARD_MAX_AGE = 10
+# Time allowed to stop a running schedule and restore the working mode on unload
+SCHEDULE_END_TIMEOUT = 10
+# Writable settings: name -> (read register, write register, min, max).
+# The working mode is reported in 7101 but written through 47005, the LED state in 7171 but written to 7265.
+SETTING_REGISTERS = {
+    "inverter_input_power": (1138, 1138, 0, 2400),
+    "backup_soc": (1142, 1142, 5, 100),
+    "grid_charging": (1143, 1143, 0, 1),
+    "feed_in_power": (1146, 1146, 0, 2400),
+    "ac_output_power": (1147, 1147, 0, 2400),
+    "bypass_socket": (7266, 7266, 0, 1),
+    "led_light": (7171, 7265, 0, 1),
+    "working_mode": (7101, 47005, 1, 5),
+}
+WORKING_MODES = {
+    "self_consumption": 1,
+    "realtime": 4,
+    "schedule": 5,
+}
+PLATFORMS = [
+    Platform.SENSOR,
+    Platform.BINARY_SENSOR,
+    Platform.NUMBER,
+    Platform.SELECT,
+    Platform.SWITCH,
+]
+
+SUPPORTED_MODELS = [
+    "BK1600/BK1600Ultra",
+    "SolidFlex/PowerFlex2000"
+]
+
+
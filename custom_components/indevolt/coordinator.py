@@ -1,61 +1,871 @@
-from __future__ import annotations
-import logging
-from typing import Any, Dict
-from datetime import timedelta
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
-from .indevolt_api import IndevoltAPI
-from .utils import get_device_gen
-from .sensor import SENSORS_GEN1, SENSORS_GEN2
-
-_LOGGER = logging.getLogger(__name__)
-
-class IndevoltCoordinator(DataUpdateCoordinator):
-    """Coordinator for Indevolt device data updates."""
-    
-    def __init__(self, hass, entry: ConfigEntry):
-        scan_interval = entry.options.get("scan_interval", entry.data.get("scan_interval", DEFAULT_SCAN_INTERVAL))
-        super().__init__(hass, _LOGGER, name=f"{DOMAIN}_{entry.entry_id}", update_interval=timedelta(seconds=scan_interval))
-        self.config_entry = entry
-        self.api = IndevoltAPI(host=entry.data['host'], port=entry.data['port'], session=async_get_clientsession(hass))
-        self._first_update = True
-        # Get batch size from config, default to 50
-        self.batch_size = entry.options.get("batch_size", entry.data.get("batch_size", 65))
-
-    async def _async_update_data(self) -> Dict[str, Any]:
-        """Fetch latest data from device."""
-        try:
-            # Select correct sensor list based on model
-            gen = get_device_gen(self.config_entry.data.get("device_model"))
-            sensor_list = SENSORS_GEN1 if gen == 1 else SENSORS_GEN2
-            
-            # Extract keys as integers for the API call
-            keys = [int(desc.key) for desc in sensor_list]
-            
-            # Fetch data with batching support
-            data = await self.api.fetch_data(keys, batch_size=self.batch_size)
-            
-            # If device is offline, return empty data instead of raising error
-            if not data:
-                if self._first_update:
-                    raise UpdateFailed("No data received from device - check if device is online")
-                _LOGGER.debug("Device is offline or unreachable - will retry later")
-                # Return last known data if available, otherwise empty dict
-                return self.data if self.data else {}
-
-            if self._first_update:
-                _LOGGER.info("Successfully connected to Indevolt device (using batch size: %d)", self.batch_size)
-                self._first_update = False
-
-            return data
-        except UpdateFailed:
-            # Re-raise UpdateFailed for first update
-            raise
-        except Exception as err:
-            # For subsequent updates, log but don't raise to avoid spam
-            if self._first_update:
-                raise UpdateFailed(f"Failed to fetch data: {err}") from err
-            _LOGGER.debug(f"Failed to fetch data: {err}")
-            return self.data if self.data else {}
+from __future__ import annotations
+import asyncio
+import cProfile
+import logging
+import time
+from collections import Counter
+from typing import Any, Dict
+from datetime import datetime, timedelta
+from contextlib import nullcontext
+from functools import partial
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, Context, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.components.sensor import SensorStateClass
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from .const import (
+    DOMAIN,
+    DEFAULT_SCAN_INTERVAL,
+    STORAGE_VERSION,
+    STORAGE_SAVE_DELAY,
+    INTEGRATION_MAX_GAP,
+    DEFAULT_SAMPLE_BUFFER_SIZE,
+    SAMPLE_FLUSH_INTERVAL,
+    PROBE_TIMEOUT,
+    SNAPSHOT_MAX_AGE,
+    MISSING_KEY_POLLS,
+    SETTING_REGISTERS,
+    DEFAULT_MAX_CHARGE_POWER,
+    DEFAULT_MAX_DISCHARGE_POWER,
+    DEFAULT_VIRTUAL_MIN_SOC,
+    ESTIMATE_WINDOW,
+    COMMAND_QUEUE_SIZE,
+    REQUEST_RATE,
+    REQUEST_BURST,
+    PROXY_CACHE_SIZE,
+    PLAUSIBILITY_WINDOW,
+    SLOW_TIER_POLLS,
+    SOC_GUARD_MAX_AGE,
+    SCHEDULE_END_TIMEOUT,
+)
+from .alerts import ALERT_BITS, AlertDecoder
+from .backfill import async_import_buffered_statistics
+from .capabilities import async_probe_capabilities
+from .capture import CaptureSession
+from .energy import INTEGRATED_ENERGY, EnergyIntegrator
+from .estimates import SocEstimator
+from .indevolt_api import IndevoltAPI
+from .optimizer import ACTION_CHARGE, ACTION_DISCHARGE, optimize_schedule
+from .packs import PACKS, pack_present
+from .plausibility import PlausibilityFilter
+from .profiling import ProfileSession, write_profile
+from .register_maps import RegisterMap
+from .profiles import diff_settings, plan_writes, read_keys
+from .sample_buffer import SampleBuffer, write_sample_file
+from .scheduler import RequestScheduler
+from .thresholds import ThresholdMonitor
+from .utils import get_entry_gen
+from .sensor import pack_descriptions
+
+_LOGGER = logging.getLogger(__name__)
+
+# Options that change what the coordinator is made of; everything else is applied live
+RELOAD_OPTIONS = ("enable_sample_buffer", "sample_buffer_size")
+
+# Polled even without an enabled entity: SOC is needed by the charge/discharge guards
+ALWAYS_POLLED_KEYS = ("6002",)
+
+class IndevoltCoordinator(DataUpdateCoordinator):
+    """Coordinator for Indevolt device data updates."""
+    
+    def __init__(self, hass, entry: ConfigEntry, register_map: RegisterMap):
+        scan_interval = entry.options.get("scan_interval", entry.data.get("scan_interval", DEFAULT_SCAN_INTERVAL))
+        super().__init__(hass, _LOGGER, name=f"{DOMAIN}_{entry.entry_id}", update_interval=timedelta(seconds=scan_interval))
+        self.config_entry = entry
+        # All requests to the device (polls, services, capture) share one scheduler
+        self.scheduler = RequestScheduler(REQUEST_RATE, REQUEST_BURST)
+        self.api = IndevoltAPI(host=entry.data['host'], port=entry.data['port'], session=async_get_clientsession(hass), scheduler=self.scheduler)
+        self._first_update = True
+        # Get batch size from config, default to 50
+        self.batch_size = entry.options.get("batch_size", entry.data.get("batch_size", 65))
+        # Options applied so far (see async_apply_options) and the limits the services use
+        self._applied_options = dict(entry.options)
+        self.limits: Dict[str, Any] = {}
+        self._read_limits()
+        # Persistent state (guard values, energy totals), written batched via Store
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}")
+        self._save_scheduled = False
+        self.guard_state: Dict[str, Dict[str, Any]] = {}
+        self._snapshot: Dict[str, Any] | None = None
+        self._snapshot_time: float | None = None
+        # When each value in data was read from the device (epoch seconds); held and carried-over values keep their time
+        self.sample_times: Dict[str, float] = {}
+        # Battery packs present on the device (index into PACKS); the Main Unit always exists on GEN2
+        self.gen = get_entry_gen(entry)
+        # Sensor registers of the model (registers/gen<N>.json); slow-tier registers are polled every SLOW_TIER_POLLS polls
+        self.register_map = register_map
+        self._slow_keys = {key for key, tier in register_map.tiers.items() if tier == "slow"}
+        self.packs: list[int] = [0] if self.gen == 2 else []
+        self.signal_new_packs = f"{DOMAIN}_{entry.entry_id}_new_packs"
+        # Registers needed by enabled entities (reference counted, see async_register_entity_keys)
+        self._entity_keys: Counter[str] = Counter()
+        # Registers the device never answers (from the capability profile) and consecutive misses per register
+        self.unsupported_keys: set[str] = set((entry.data.get("capabilities") or {}).get("unsupported", []))
+        self._missing_counts: Counter[str] = Counter()
+        # Energy integration for registers the firmware doesn't provide
+        polled = {desc.key for desc in self.sensor_list()}
+        self.energy = EnergyIntegrator(
+            {
+                key: target for key, target in INTEGRATED_ENERGY.items()
+                if target.power_key in polled and (target.state_key is None or target.state_key in polled)
+            },
+            max_gap=max(INTEGRATION_MAX_GAP, 3 * scan_interval),
+        )
+        # Range/rate/spike validation of measurement registers (enable_safety_filter option)
+        self.plausibility = PlausibilityFilter(
+            [*self.sensor_list(), *(desc for pack in PACKS if self.gen == 2 for desc in pack_descriptions(pack))],
+            PLAUSIBILITY_WINDOW,
+        )
+        # User threshold rules (thresholds option), evaluated once per update
+        self.thresholds = ThresholdMonitor(entry.options.get("thresholds") or {})
+        # Alert bitfields, decoded only when their raw value changes
+        self.alerts = AlertDecoder(key for key in ALERT_BITS if key in polled)
+        # Remaining-time estimates from the rolling SOC/power history
+        self.estimator = SocEstimator(ESTIMATE_WINDOW)
+        # Optional local sample buffer (measurement registers only) for statistics backfill
+        self.sample_buffer: SampleBuffer | None = None
+        self._buffered_keys = {desc.key for desc in self.sensor_list() if desc.state_class == SensorStateClass.MEASUREMENT}
+        self._last_sample_flush = time.monotonic()
+        self.statistics_imported_until: float | None = None
+        # High-resolution capture (see async_capture)
+        self.capture: CaptureSession | None = None
+        self.capture_result: Dict[str, Any] = {"status": "idle"}
+        # Price-optimized schedule (see async_optimize_schedule) and its slot timers
+        self.schedule: Dict[str, Any] | None = None
+        self._schedule_unsubs: list[CALLBACK_TYPE] = []
+        self._schedule_restore_mode: int | None = None  # Working mode (7101) before the executing plan
+        # Poll statistics and a counter bumped whenever listeners see new data (metrics cache key)
+        self.poll_stats: Dict[str, Any] = {"polls": 0, "poll_failures": 0, "poll_seconds": 0.0, "last_poll_seconds": None}
+        self.data_version = 0
+        # Running profile session (see async_profile) and whether a poll is in progress
+        self.profile: ProfileSession | None = None
+        self._polling = False
+        # Registers read on demand for RPC proxy clients: key -> (time, value)
+        self._proxy_cache: Dict[str, tuple[float, Any]] = {}
+        # Commands from services called with wait: false, run one at a time by async_run_command_worker
+        self._commands: asyncio.Queue = asyncio.Queue(COMMAND_QUEUE_SIZE)
+        if entry.options.get("enable_sample_buffer", False):
+            self.sample_buffer = SampleBuffer(
+                hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry.entry_id}.samples"),
+                int(entry.options.get("sample_buffer_size", DEFAULT_SAMPLE_BUFFER_SIZE)),
+            )
+
+    def _read_limits(self) -> None:
+        options = self.config_entry.options
+        self.limits = {
+            "max_charge_power": options.get("max_charge_power", DEFAULT_MAX_CHARGE_POWER),
+            "max_discharge_power": options.get("max_discharge_power", DEFAULT_MAX_DISCHARGE_POWER),
+            "virtual_min_soc": options.get("virtual_min_soc", DEFAULT_VIRTUAL_MIN_SOC),
+        }
+
+    def options_unchanged(self) -> bool:
+        """True if the entry's options are the ones already applied."""
+        return dict(self.config_entry.options) == self._applied_options
+
+    @callback
+    def async_apply_options(self) -> bool:
+        """Apply changed options without reloading; return False if the change needs a reload."""
+        options = dict(self.config_entry.options)
+        if options == self._applied_options:
+            return True
+        previous, self._applied_options = self._applied_options, options
+        if any(previous.get(key) != options.get(key) for key in RELOAD_OPTIONS):
+            return False
+
+        scan_interval = options.get("scan_interval", self.config_entry.data.get("scan_interval", DEFAULT_SCAN_INTERVAL))
+        self.update_interval = timedelta(seconds=scan_interval)
+        self.energy.max_gap = max(INTEGRATION_MAX_GAP, 3 * scan_interval)
+        self.batch_size = options.get("batch_size", self.config_entry.data.get("batch_size", 65))
+        self._read_limits()
+        self.thresholds.configure(options.get("thresholds") or {})
+        _LOGGER.debug("Options applied: interval %ss, batch size %s, limits %s", scan_interval, self.batch_size, self.limits)
+        return True
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Decode changed alert registers before entities look at the new data."""
+        self.data_version += 1
+        self.alerts.update(self.data or {})
+        with self._span("entity_updates"):
+            super().async_update_listeners()
+
+    @callback
+    def _async_fire_thresholds(self, data: Dict[str, Any]) -> None:
+        """Evaluate threshold rules on validated poll data; optimistic or rolled-back values never count."""
+        for rule, active, value in self.thresholds.update(data):
+            self.hass.bus.async_fire(
+                f"{DOMAIN}_threshold",
+                {
+                    "entry_id": self.config_entry.entry_id,
+                    "sn": self.config_entry.data.get("sn"),
+                    "rule": rule.name,
+                    "register": rule.register,
+                    "value": value,
+                    "threshold": rule.threshold,
+                    "direction": "above" if rule.above else "below",
+                    "active": active,
+                },
+            )
+
+    def sensor_list(self):
+        """Return the sensor descriptions for the configured model."""
+        return self.register_map.descriptions
+
+    def poll_keys(self) -> list[int]:
+        """Return the registers to poll.
+
+        Once entities are set up this is only what enabled entities need;
+        before that, all model sensors plus those of discovered packs.
+        """
+        if self._entity_keys:
+            keys = [key for key in (*self._entity_keys, *self.thresholds.keys) if key not in self.unsupported_keys]
+            return [int(key) for key in dict.fromkeys((*keys, *ALWAYS_POLLED_KEYS))]
+        keys = [desc.key for desc in self.sensor_list()]
+        for index in self.packs:
+            keys.extend(PACKS[index].keys.values())
+        return [int(key) for key in dict.fromkeys(keys) if key not in self.unsupported_keys]
+
+    @callback
+    def async_register_entity_keys(self, keys) -> CALLBACK_TYPE:
+        """Add registers an enabled entity needs to the poll plan; returns the removal callback."""
+        self._entity_keys.update(keys)
+
+        @callback
+        def _async_unregister() -> None:
+            self._entity_keys.subtract(keys)
+            for key in keys:
+                if self._entity_keys[key] <= 0:
+                    del self._entity_keys[key]
+
+        return _async_unregister
+
+    async def async_detect_capabilities(self) -> None:
+        """Probe model and firmware and update the capability profile stored in the entry."""
+        profile = await async_probe_capabilities(self.api, PROBE_TIMEOUT)
+        if profile is None:
+            _LOGGER.debug("Capability detection skipped - device not reachable")
+            return
+        if profile["gen"] == 1 and self.gen == 2:
+            # GEN1 is only inferred from GEN2 registers missing in the answer, which a
+            # partial or timed-out probe looks like too; only a positive GEN2 answer changes the model
+            _LOGGER.debug("Capability probe without GEN2 registers, keeping the configured model")
+            return
+
+        entry = self.config_entry
+        stored = entry.data.get("capabilities") or {}
+        if stored.get("fw_version") == profile["fw_version"]:
+            # Same firmware: what was learned about missing registers still holds
+            profile["unsupported"] = stored.get("unsupported", [])
+        else:
+            self.unsupported_keys.clear()
+        if stored.get("model_override"):
+            profile.update(gen=stored["gen"], model=stored["model"], model_override=True)
+        if profile == stored:
+            return
+
+        _LOGGER.info("Detected %s, firmware %s", profile["model"], profile["fw_version"])
+        self.hass.config_entries.async_update_entry(
+            entry,
+            data={**entry.data, "device_model": profile["model"], "fw_version": profile["fw_version"], "capabilities": profile},
+        )
+        if profile["gen"] != self.gen:
+            # Different sensor list and pack layout: set the entry up again for the detected model
+            _LOGGER.warning("Configured model doesn't match the device, reloading as %s", profile["model"])
+            self.hass.config_entries.async_schedule_reload(entry.entry_id)
+
+    @callback
+    def _async_learn_unsupported(self, keys: list[int], data: Dict[str, Any], failed: set[str]) -> None:
+        """Exclude registers the device keeps leaving out of otherwise successful responses."""
+        learned = []
+        for key in map(str, keys):
+            # A failed request says nothing about the registers in it
+            if key in failed:
+                continue
+            if key in data:
+                self._missing_counts.pop(key, None)
+                continue
+            self._missing_counts[key] += 1
+            if self._missing_counts[key] >= MISSING_KEY_POLLS and key not in ALWAYS_POLLED_KEYS:
+                learned.append(key)
+
+        if not learned:
+            return
+        _LOGGER.info("Registers not supported by the device, no longer polled: %s", ", ".join(learned))
+        for key in learned:
+            self._missing_counts.pop(key, None)
+        self.unsupported_keys.update(learned)
+        entry = self.config_entry
+        capabilities = {**(entry.data.get("capabilities") or {}), "unsupported": sorted(self.unsupported_keys, key=int)}
+        self.hass.config_entries.async_update_entry(entry, data={**entry.data, "capabilities": capabilities})
+
+    async def async_discover_packs(self, *_) -> None:
+        """Probe which battery packs answer and add the new ones to the poll plan."""
+        if self.gen != 2:
+            return
+        data = await self.api.fetch_data([int(pack.probe_key) for pack in PACKS], timeout=PROBE_TIMEOUT)
+        if not data:
+            _LOGGER.debug("Battery pack discovery skipped - device not reachable")
+            return
+
+        found = [pack.index for pack in PACKS if pack.index == 0 or pack_present(data.get(pack.probe_key))]
+        new = [index for index in found if index not in self.packs]
+        if found != self.packs:
+            _LOGGER.info("Battery packs present: %s", ", ".join(PACKS[index].name for index in found))
+            self.packs = found
+            self._async_schedule_save()
+        if new:
+            async_dispatcher_send(self.hass, self.signal_new_packs, new)
+
+    async def async_load_stored_state(self) -> None:
+        """Load persisted state from HA storage."""
+        stored = await self._store.async_load() or {}
+        self.guard_state = stored.get("guard", {})
+        self._snapshot = stored.get("snapshot")
+        self._snapshot_time = stored.get("snapshot_time")
+        if self.gen == 2 and "packs" in stored:
+            self.packs = stored["packs"]
+        self.energy.restore(stored.get("energy"))
+        self.statistics_imported_until = stored.get("statistics_imported_until")
+        if self.sample_buffer is not None:
+            await self.hass.async_add_executor_job(self.sample_buffer.load)
+
+    @callback
+    def async_restore_snapshot(self) -> bool:
+        """Use the last stored snapshot as current data; return False if there is none or it is too old."""
+        if not self._snapshot or self._snapshot_time is None:
+            return False
+        if time.time() - self._snapshot_time > SNAPSHOT_MAX_AGE:
+            _LOGGER.debug("Stored snapshot is too old, waiting for a full first poll")
+            return False
+        # Later failures keep serving the snapshot instead of failing setup
+        self._first_update = False
+        self.sample_times = dict.fromkeys(self._snapshot, self._snapshot_time)
+        self.async_set_updated_data(self._snapshot)
+        return True
+
+    async def async_probe_and_refresh(self) -> None:
+        """Probe the device with a short timeout, then run the first full poll."""
+        if not await self.api.fetch_data([0], timeout=PROBE_TIMEOUT):
+            _LOGGER.info("Device not reachable yet - using cached data until the next scheduled poll")
+            return
+        await self.async_refresh()
+
+    async def async_flush_stored_state(self) -> None:
+        """Write pending state immediately (used on unload)."""
+        await self.async_flush_samples()
+        if self._save_scheduled:
+            await self._store.async_save(self._data_to_store())
+
+    async def async_flush_samples(self) -> None:
+        """Append buffered samples to disk in the executor."""
+        self._last_sample_flush = time.monotonic()
+        if self.sample_buffer is not None and (job := self.sample_buffer.take_flush_job()):
+            await self.hass.async_add_executor_job(job)
+
+    @callback
+    def _async_record_samples(self, data: Dict[str, Any]) -> None:
+        """Append this poll's measurement values to the sample buffer."""
+        values = {key: value for key, value in data.items() if key in self._buffered_keys and isinstance(value, (int, float))}
+        self.sample_buffer.append(time.time(), values)
+        if time.monotonic() - self._last_sample_flush >= SAMPLE_FLUSH_INTERVAL:
+            self.config_entry.async_create_background_task(
+                self.hass, self.async_flush_samples(), f"{DOMAIN}_flush_samples"
+            )
+
+    async def async_backfill_statistics(self, since: float | None = None) -> int:
+        """Import complete hours from the sample buffer into long-term statistics."""
+        if self.sample_buffer is None:
+            return 0
+        if since is None:
+            since = self.statistics_imported_until or 0.0
+        until = dt_util.utcnow().replace(minute=0, second=0, microsecond=0).timestamp()
+        if since >= until:
+            return 0
+        imported = await async_import_buffered_statistics(self.hass, self, since, until)
+        self.statistics_imported_until = until
+        self._async_schedule_save()
+        return imported
+
+    @callback
+    def async_update_guard(self, key: str, value: float, date) -> None:
+        """Remember the last accepted value of a TOTAL_INCREASING register."""
+        date_str = date.isoformat()
+        current = self.guard_state.get(key)
+        if current and current["value"] == value and current["date"] == date_str:
+            return
+        self.guard_state[key] = {"value": value, "date": date_str}
+        self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Schedule one delayed write; further changes are picked up by the same write."""
+        if self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> Dict[str, Any]:
+        """Return the data to persist."""
+        self._save_scheduled = False
+        return {
+            "guard": self.guard_state,
+            "snapshot": self._snapshot,
+            "snapshot_time": self._snapshot_time,
+            "packs": self.packs,
+            "energy": self.energy.as_dict(),
+            "statistics_imported_until": self.statistics_imported_until,
+        }
+
+    async def async_apply_settings(self, settings: Dict[str, int]) -> Dict[str, Any]:
+        """Write only the settings that differ from the device, merging consecutive registers into one write."""
+        current = await self.api.fetch_data(read_keys(settings), timeout=PROBE_TIMEOUT)
+        if not current:
+            raise ConnectionError("Cannot read current settings from device")
+
+        changes = diff_settings(settings, current)
+        writes = plan_writes(changes)
+        for register, values in writes:
+            await self.api.set_data(16, register, values)
+
+        if changes and self.data is not None:
+            # Show the new values right away instead of waiting for the next poll
+            self.async_set_updated_data({
+                **self.data,
+                **{str(SETTING_REGISTERS[name][0]): change["to"] for name, change in changes.items()},
+            })
+        return {
+            "changed": changes,
+            "unchanged": [name for name in settings if name not in changes],
+            "writes": len(writes),
+        }
+
+    async def async_write_setting(self, name: str, value: int) -> None:
+        """Write one setting with optimistic state, confirm it with a read of that register, roll back on failure."""
+        read_key, write_key, _, _ = SETTING_REGISTERS[name]
+        key = str(read_key)
+        previous = (self.data or {}).get(key)
+        # New dicts only: self.data may be the persisted snapshot, which must not see unconfirmed values
+        self.async_set_updated_data({**(self.data or {}), key: value})
+        try:
+            await self.api.set_data(16, write_key, [value])
+            confirmed = (await self.api.fetch_data([read_key], timeout=PROBE_TIMEOUT)).get(key)
+        except Exception:
+            self.async_set_updated_data({**(self.data or {}), key: previous})
+            raise
+        if confirmed is None:
+            # Not readable right now; the optimistic value stays until the next poll
+            _LOGGER.debug("Could not confirm %s = %s", name, value)
+            return
+        if confirmed != value:
+            self.async_set_updated_data({**(self.data or {}), key: confirmed})
+            raise ValueError(f"Device kept {name} at {confirmed} instead of {value}")
+
+    async def async_fresh_value(self, key: str, max_age: float) -> Any:
+        """Return a register value sampled at most `max_age` seconds ago.
+
+        If the polled value is older (long scan interval, device was offline,
+        snapshot), only this register is read. Returns None if no fresh,
+        plausible value can be obtained.
+        """
+        sampled = self.sample_times.get(key)
+        if self.data and key in self.data and sampled is not None and time.time() - sampled <= max_age:
+            return self.data[key]
+
+        fetched = await self.api.fetch_data([int(key)], timeout=PROBE_TIMEOUT)
+        if key not in fetched:
+            _LOGGER.warning(
+                "Could not refresh register %s (last sample %s)",
+                key, f"{time.time() - sampled:.0f}s old" if sampled is not None else "missing",
+            )
+            return None
+        now = time.time()
+        if self._applied_options.get("enable_safety_filter", True) and self.plausibility.apply(now, fetched):
+            _LOGGER.warning("Refreshed register %s returned an implausible value", key)
+            return None
+        self.sample_times[key] = now
+        # A new dict: self.data may be the persisted snapshot; listeners show the refreshed value
+        self.async_set_updated_data({**(self.data or {}), key: fetched[key]})
+        return fetched[key]
+
+    async def async_proxy_write(self, function: int, register: int, values: list[int]) -> Dict[str, Any]:
+        """Forward a SetData request.
+
+        Real-time charge/discharge commands (47015) get the same virtual
+        Min-SOC guard and power limits as the charge/discharge services; a
+        written setting is shown right away like a write from its entity.
+        """
+        if register == 47015:
+            state, power, soc_limit = values
+            if state in (1, 2):
+                virtual_min_soc = self.limits["virtual_min_soc"]
+                current_soc = await self.async_fresh_value("6002", SOC_GUARD_MAX_AGE)
+                if current_soc is None:
+                    raise HomeAssistantError("Battery SOC could not be refreshed; command not sent")
+                if current_soc <= virtual_min_soc:
+                    raise HomeAssistantError(f"Blocked: SOC {current_soc}% at or below virtual Min-SOC {virtual_min_soc}%")
+                limit = self.limits["max_charge_power" if state == 1 else "max_discharge_power"]
+                values = [state, min(power, limit), soc_limit]
+            elif state != 0:
+                raise ValueError(f"Unknown real-time state {state}")
+
+        result = await self.api.set_data(function, register, values)
+        read_key = next((read for read, write, _, _ in SETTING_REGISTERS.values() if write == register), None)
+        if result and read_key is not None and len(values) == 1:
+            self.async_set_updated_data({**(self.data or {}), str(read_key): values[0]})
+        return result
+
+    async def async_proxy_read(self, keys: list[int]) -> Dict[str, Any]:
+        """Answer a GetData request from the last poll; fetch only registers that are missing or stale."""
+        now = time.time()
+        max_age = 2 * self.update_interval.total_seconds()
+        result: Dict[str, Any] = {}
+        missing: list[int] = []
+        for key in dict.fromkeys(keys):
+            str_key = str(key)
+            if self.data and str_key in self.data and now - self.sample_times.get(str_key, 0) <= max_age:
+                result[str_key] = self.data[str_key]
+            elif (cached := self._proxy_cache.get(str_key)) and now - cached[0] <= max_age:
+                result[str_key] = cached[1]
+            else:
+                missing.append(key)
+
+        if missing:
+            fetched = await self.api.fetch_data(missing, batch_size=self.batch_size)
+            if len(self._proxy_cache) + len(fetched) > PROXY_CACHE_SIZE:
+                self._proxy_cache.clear()
+            fetched_at = time.time()
+            self._proxy_cache.update((key, (fetched_at, value)) for key, value in fetched.items())
+            result.update(fetched)
+        return result
+
+    @callback
+    def async_queue_command(self, service: str, command, args: tuple, context: Context | None = None) -> None:
+        """Queue a device command for the worker; raises if too many are pending."""
+        try:
+            self._commands.put_nowait((service, command, args, context, time.monotonic()))
+        except asyncio.QueueFull as err:
+            raise ConnectionError(f"Too many pending commands for device {self.config_entry.entry_id}") from err
+
+    async def async_run_command_worker(self) -> None:
+        """Run queued commands in order and report each outcome as an indevolt_command_result event."""
+        while True:
+            service, command, args, context, queued = await self._commands.get()
+            started = time.monotonic()
+            result, error = None, None
+            try:
+                result = await command(*args)
+            except Exception as err:
+                error = str(err) or type(err).__name__
+                _LOGGER.warning("Queued %s command failed: %s", service, error)
+            finally:
+                self._commands.task_done()
+            self.hass.bus.async_fire(
+                f"{DOMAIN}_command_result",
+                {
+                    "entry_id": self.config_entry.entry_id,
+                    "service": service,
+                    "success": error is None,
+                    "error": error,
+                    "result": result if isinstance(result, dict) else None,
+                    "queue_time": round(started - queued, 3),
+                    "latency": round(time.monotonic() - started, 3),
+                },
+                context=context,
+            )
+
+    async def async_optimize_schedule(
+        self,
+        prices: list[float],
+        slot_minutes: int,
+        start: datetime,
+        load: list[float] | None = None,
+        feed_in_price: float | None = None,
+        capacity: float | None = None,
+        execute: bool = True,
+    ) -> Dict[str, Any]:
+        """Solve the cheapest charge/discharge plan for the price slots and optionally execute it."""
+        capacity = capacity or (self.data or {}).get("142") or (self.config_entry.data.get("capabilities") or {}).get("rated_capacity")
+        if not capacity:
+            raise ValueError("Rated capacity (register 142) is unknown, pass it to the service")
+        if (soc := await self.async_fresh_value("6002", SOC_GUARD_MAX_AGE)) is None:
+            raise ValueError("Current SOC (register 6002) is unknown")
+
+        result = await self.hass.async_add_executor_job(
+            partial(
+                optimize_schedule,
+                prices,
+                slot_minutes / 60,
+                float(capacity),
+                float(soc),
+                float(self.limits["virtual_min_soc"]),
+                float(self.limits["max_charge_power"]),
+                float(self.limits["max_discharge_power"]),
+                load=load,
+                feed_in_price=feed_in_price,
+            )
+        )
+        for index, slot in enumerate(result["slots"]):
+            slot["start"] = (start + timedelta(minutes=slot_minutes * index)).isoformat()
+
+        if execute and start + timedelta(minutes=slot_minutes * len(prices)) <= dt_util.utcnow():
+            raise ValueError("The plan has already ended, nothing to execute")
+        replaced_running = bool(self._schedule_unsubs)
+        self.async_cancel_schedule()
+        if execute:
+            # A replaced plan that is still running keeps the mode from before it for the restore
+            if not replaced_running:
+                self._schedule_restore_mode = await self.async_fresh_value("7101", self.update_interval.total_seconds())
+            # Commands from the plan are real-time control commands
+            await self.api.async_set_mode(4)
+            self._async_schedule_slots(result["slots"], start, slot_minutes)
+        elif replaced_running:
+            self._async_finish_schedule()
+        self.schedule = {"start": start.isoformat(), "slot_minutes": slot_minutes, "executing": execute, **result}
+        self.async_update_listeners()
+        return self.schedule
+
+    @callback
+    def _async_schedule_slots(self, slots: list[Dict[str, Any]], start: datetime, slot_minutes: int) -> None:
+        """Set a timer for every slot boundary where the command changes, and a stop at the end.
+
+        Slots that already ended are skipped; the slot covering now is sent immediately.
+        """
+        now = dt_util.utcnow()
+        current = max(0, int((now - start).total_seconds() // (slot_minutes * 60)))
+        previous = None
+        for index in range(current, len(slots)):
+            slot = slots[index]
+            command = (slot["action"], slot["power"])
+            if command == previous:
+                continue
+            previous = command
+            at = start + timedelta(minutes=slot_minutes * index)
+            if at <= now:
+                self._async_run_slot(slot)
+            else:
+                self._schedule_unsubs.append(async_track_point_in_utc_time(self.hass, partial(self._async_run_slot, slot), at))
+        end = start + timedelta(minutes=slot_minutes * len(slots))
+        self._schedule_unsubs.append(async_track_point_in_utc_time(self.hass, self._async_finish_schedule, end))
+
+    @callback
+    def _async_run_slot(self, slot: Dict[str, Any], *_) -> None:
+        """Send the command of a schedule slot."""
+        self.config_entry.async_create_background_task(self.hass, self._async_send_slot(slot), f"{DOMAIN}_schedule_slot")
+
+    async def _async_send_slot(self, slot: Dict[str, Any]) -> None:
+        try:
+            if slot["action"] == ACTION_CHARGE:
+                await self.api.async_charge(slot["power"], slot["soc"], self.limits["max_charge_power"])
+            elif slot["action"] == ACTION_DISCHARGE:
+                await self.api.async_discharge(slot["power"], slot["soc"], self.limits["max_discharge_power"])
+            else:
+                await self.api.async_stop()
+        except ConnectionError as err:
+            _LOGGER.warning("Failed to send scheduled %s command: %s", slot["action"], err)
+        self.async_update_listeners()
+
+    @callback
+    def _async_finish_schedule(self, *_) -> None:
+        """Stop at the end of the plan and restore the working mode from before it."""
+        self._schedule_unsubs.clear()
+        restore_mode, self._schedule_restore_mode = self._schedule_restore_mode, None
+        self.config_entry.async_create_background_task(
+            self.hass, self._async_end_schedule(restore_mode), f"{DOMAIN}_schedule_end"
+        )
+        if self.schedule is not None:
+            self.schedule["executing"] = False
+
+    async def _async_end_schedule(self, restore_mode: int | None) -> None:
+        try:
+            await self.api.async_stop()
+            if restore_mode is not None and restore_mode != 4:
+                await self.api.async_set_mode(int(restore_mode))
+        except ConnectionError as err:
+            _LOGGER.warning("Failed to end the schedule (working mode %s): %s", restore_mode, err)
+        self.async_update_listeners()
+
+    async def async_shutdown_schedule(self) -> None:
+        """Cancel the plan's timers on unload; a running plan is ended so the device isn't left in real-time control."""
+        running = bool(self._schedule_unsubs)
+        self.async_cancel_schedule()
+        if not running:
+            return
+        restore_mode, self._schedule_restore_mode = self._schedule_restore_mode, None
+        try:
+            await asyncio.wait_for(self._async_end_schedule(restore_mode), SCHEDULE_END_TIMEOUT)
+        except asyncio.TimeoutError:
+            _LOGGER.warning("Device didn't confirm the end of the schedule in time (working mode %s)", restore_mode)
+
+    @callback
+    def async_cancel_schedule(self) -> None:
+        """Cancel the pending slot timers of the current plan."""
+        for unsub in self._schedule_unsubs:
+            unsub()
+        self._schedule_unsubs.clear()
+        if self.schedule is not None:
+            self.schedule["executing"] = False
+
+    async def async_capture(self, keys: list[str], interval: float, duration: float, window: float, export: bool) -> None:
+        """Sample `keys` every `interval` seconds for `duration` seconds and publish per-window statistics.
+
+        Samples go into preallocated arrays instead of entity states, so the
+        recorder only sees the aggregated result.
+        """
+        if self.capture is not None:
+            raise RuntimeError("A capture is already running on this device")
+
+        session = self.capture = CaptureSession(keys, interval, duration, window)
+        self.capture_result = {"status": "running", "registers": keys, "interval": interval, "started": dt_util.utcnow().isoformat()}
+        self.async_update_listeners()
+
+        int_keys = [int(key) for key in keys]
+        loop = self.hass.loop
+        next_tick = loop.time()
+        try:
+            while not session.full:
+                data = await self.api.fetch_data(int_keys, batch_size=self.batch_size, timeout=max(interval, 1))
+                ts = time.time()
+                session.add(ts, data)
+                if self.sample_buffer is not None and data:
+                    self.sample_buffer.append(ts, {key: value for key, value in data.items() if isinstance(value, (int, float))})
+                next_tick += interval
+                await asyncio.sleep(max(0.0, next_tick - loop.time()))
+
+            windows = await self.hass.async_add_executor_job(session.summarize)
+            file_path = None
+            if export:
+                sn = self.config_entry.data.get("sn", "unknown")
+                file_path = self.hass.config.path(f"{DOMAIN}_capture_{sn}_{int(session.times[0])}.bin")
+                await self.hass.async_add_executor_job(write_sample_file, file_path, session.samples())
+
+            self.capture_result = {**self.capture_result, "status": "done", "samples": session.count, "windows": windows, "file": file_path}
+            self.hass.bus.async_fire(
+                f"{DOMAIN}_capture_complete",
+                {"entry_id": self.config_entry.entry_id, "samples": session.count, "windows": len(windows), "file": file_path},
+            )
+        except asyncio.CancelledError:
+            self.capture_result = {**self.capture_result, "status": "cancelled", "samples": session.count}
+            raise
+        finally:
+            self.capture = None
+            self.async_update_listeners()
+
+    def _record_poll(self, started: float, ok: bool) -> None:
+        elapsed = time.monotonic() - started
+        self.poll_stats["polls"] += 1
+        self.poll_stats["poll_seconds"] += elapsed
+        self.poll_stats["last_poll_seconds"] = round(elapsed, 4)
+        if not ok:
+            self.poll_stats["poll_failures"] += 1
+
+    def _span(self, name: str):
+        """Timing span of the running profile session, if any."""
+        return self.profile.span(name) if self.profile is not None else nullcontext()
+
+    async def async_profile(self, duration: float, use_cprofile: bool) -> Dict[str, Any]:
+        """Collect timing spans and event-loop lag (plus cProfile stats) for `duration` seconds.
+
+        The summary and the cProfile dump are written to the config directory.
+        """
+        if self.profile is not None:
+            raise RuntimeError("A profile is already running on this device")
+
+        session = self.profile = self.api.profile = ProfileSession()
+        lag_task = self.hass.loop.create_task(session.async_sample_lag(lambda: self._polling))
+        profiler = None
+        if use_cprofile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Only one profiler can be active per thread (e.g. another device's profile)
+                _LOGGER.warning("Another profiler is active, collecting spans only")
+                profiler = None
+        try:
+            await asyncio.sleep(duration)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            lag_task.cancel()
+            self.profile = self.api.profile = None
+
+        summary = session.summary()
+        sn = self.config_entry.data.get("sn", "unknown")
+        base_path = self.hass.config.path(f"{DOMAIN}_profile_{sn}_{int(time.time())}")
+        files = await self.hass.async_add_executor_job(write_profile, base_path, summary, profiler)
+        return {**summary, "files": files}
+
+    async def _async_update_data(self) -> Dict[str, Any]:
+        """Fetch latest data from device."""
+        self._polling = True
+        try:
+            with self._span("update"):
+                return await self._async_poll()
+        finally:
+            self._polling = False
+
+    async def _async_poll(self) -> Dict[str, Any]:
+        try:
+            # Fetch data with batching support
+            keys = self.poll_keys()
+            skipped: list[str] = []
+            if self.data and self.poll_stats["polls"] % SLOW_TIER_POLLS:
+                # Slow-tier registers (versions, ratings, states) are read every SLOW_TIER_POLLS polls and carried over in between
+                skipped = [str(key) for key in keys if str(key) in self._slow_keys]
+                keys = [key for key in keys if str(key) not in self._slow_keys]
+            started = time.monotonic()
+            failed: set[str] = set()
+            with self._span("fetch"):
+                data = await self.api.fetch_data(keys, batch_size=self.batch_size, failed=failed)
+            self._record_poll(started, bool(data))
+            
+            # If device is offline, return empty data instead of raising error
+            if not data:
+                if self._first_update:
+                    raise UpdateFailed("No data received from device - check if device is online")
+                _LOGGER.debug("Device is offline or unreachable - will retry later")
+                # Return last known data if available, otherwise empty dict
+                return self.data if self.data else {}
+
+            if self._first_update:
+                _LOGGER.info("Successfully connected to Indevolt device (using batch size: %d)", self.batch_size)
+                self._first_update = False
+
+            sampled = time.time()
+            self._async_learn_unsupported(keys, data, failed)
+            for key in skipped:
+                if key in self.data:
+                    data.setdefault(key, self.data[key])
+            rejected: Dict[str, Any] = {}
+            if self._applied_options.get("enable_safety_filter", True):
+                rejected = self.plausibility.apply(sampled, data)
+                if rejected:
+                    _LOGGER.debug("Rejected implausible values: %s", rejected)
+
+            # Integrate power into the energy registers the firmware doesn't provide
+            data.update(self.energy.update(data, dt_util.utcnow()))
+            backup_soc = data.get("1142", self.limits["virtual_min_soc"])
+            data.update(self.estimator.update(time.time(), data, backup_soc))
+            self.sample_times.update((key, sampled) for key in data if key not in rejected and key not in skipped)
+            self._snapshot, self._snapshot_time = data, time.time()
+            self._async_schedule_save()
+            if self.sample_buffer is not None:
+                self._async_record_samples(data)
+            self._async_fire_thresholds(data)
+
+            return data
+        except UpdateFailed:
+            # Re-raise UpdateFailed for first update
+            raise
+        except Exception as err:
+            # For subsequent updates, log but don't raise to avoid spam
+            if self._first_update:
+                raise UpdateFailed(f"Failed to fetch data: {err}") from err
+            _LOGGER.debug(f"Failed to fetch data: {err}")
+            return self.data if self.data else {}
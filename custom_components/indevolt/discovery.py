@@ -0,0 +1,59 @@
+"""Concurrent LAN discovery of Indevolt devices via the GetData endpoint."""
+from __future__ import annotations
+import asyncio
+import ipaddress
+import logging
+from typing import Any, Dict, Iterable, List
+import aiohttp
+from .capabilities import async_probe_capabilities
+from .indevolt_api import IndevoltAPI
+
+_LOGGER = logging.getLogger(__name__)
+
+def parse_ports(ports: str) -> List[int]:
+    """Parse "8080", "8080,8081" or "8080-8085" into a list of ports."""
+    result: List[int] = []
+    for part in str(ports).replace(" ", "").split(","):
+        if not part:
+            continue
+        first, _, last = part.partition("-")
+        start, end = int(first), int(last or first)
+        if not 1 <= start <= end <= 65535:
+            raise ValueError(f"Invalid port range: {part}")
+        result.extend(range(start, end + 1))
+    return list(dict.fromkeys(result))
+
+def network_hosts(network: str, max_hosts: int) -> List[str]:
+    """Return the host addresses of a subnet such as 192.168.1.0/24."""
+    net = ipaddress.ip_network(network, strict=False)
+    if net.num_addresses > max_hosts + 2:
+        raise ValueError(f"Network {network} is larger than {max_hosts} hosts")
+    if net.num_addresses == 1:
+        return [str(net.network_address)]
+    return [str(ip) for ip in net.hosts()]
+
+async def async_discover_devices(
+    session: aiohttp.ClientSession,
+    hosts: Iterable[str],
+    ports: List[int],
+    parallelism: int,
+    timeout: float,
+) -> List[Dict[str, Any]]:
+    """Probe every host/port with bounded parallelism and return the devices that answered with an SN."""
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def _probe(host: str, port: int) -> Dict[str, Any] | None:
+        async with semaphore:
+            profile = await async_probe_capabilities(IndevoltAPI(host, port, session), timeout)
+        if profile is None:
+            return None
+        _LOGGER.debug("Found Indevolt %s %s at %s:%s", profile["model"], profile["sn"], host, port)
+        return {"host": host, "port": port, "sn": profile["sn"], "capabilities": profile}
+
+    results = await asyncio.gather(*(_probe(host, port) for host in hosts for port in ports))
+    # One entry per serial number (a device may answer on several addresses)
+    found: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        if result is not None:
+            found.setdefault(result["sn"], result)
+    return list(found.values())
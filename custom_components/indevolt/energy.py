@@ -0,0 +1,94 @@
+"""Coordinator-side energy integration for registers the firmware doesn't provide."""
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Final, Optional
+from homeassistant.util import dt as dt_util
+
+# Battery Charge/Discharge State (register 6001)
+STATE_CHARGING = 1001
+STATE_DISCHARGING = 1002
+
+@dataclass(frozen=True)
+class IntegrationTarget:
+    power_key: str
+    daily: bool = True
+    state_key: Optional[str] = None  # Only integrate while this register reports `state`
+    state: Optional[int] = None
+
+INTEGRATED_ENERGY: Final = {
+    "2106": IntegrationTarget("2108", daily=False),  # Total AC Output Energy
+    "2263": IntegrationTarget("2108"),  # Daily AC Output Energy
+    "2264": IntegrationTarget("2102"),  # Daily Grid Export Energy
+    "2265": IntegrationTarget("2103"),  # Daily Off-Grid Output Energy
+    "battery_daily_charging_integrated": IntegrationTarget("6000", state_key="6001", state=STATE_CHARGING),
+    "battery_daily_discharging_integrated": IntegrationTarget("6000", state_key="6001", state=STATE_DISCHARGING),
+}
+
+class EnergyIntegrator:
+    """Integrate power registers (W) into energy (kWh) with the trapezoid rule on each poll."""
+
+    def __init__(self, targets: Dict[str, IntegrationTarget], max_gap: float):
+        self._targets = targets
+        self.max_gap = max_gap
+        self.totals: Dict[str, float] = {key: 0.0 for key in targets}
+        self._last_watts: Dict[str, Optional[float]] = {}
+        self._last_ts: Optional[float] = None
+        self._day: Optional[str] = None
+
+    def restore(self, stored: Dict[str, Any] | None) -> None:
+        """Restore totals and the last sample from storage."""
+        if not stored:
+            return
+        for key, value in stored.get("totals", {}).items():
+            if key in self.totals:
+                self.totals[key] = value
+        self._last_watts = {key: value for key, value in stored.get("last_watts", {}).items() if key in self._targets}
+        self._last_ts = stored.get("last_ts")
+        self._day = stored.get("day")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the state to persist."""
+        return {"totals": self.totals, "last_watts": self._last_watts, "last_ts": self._last_ts, "day": self._day}
+
+    def _watts(self, data: Dict[str, Any], target: IntegrationTarget) -> Optional[float]:
+        power = data.get(target.power_key)
+        if not isinstance(power, (int, float)):
+            return None
+        if target.state_key is None:
+            return float(power)
+        state = data.get(target.state_key)
+        if state is None:
+            return None
+        return abs(float(power)) if state == target.state else 0.0
+
+    def update(self, data: Dict[str, Any], now: datetime) -> Dict[str, float]:
+        """Add the interval since the previous poll and return the current totals."""
+        ts = now.timestamp()
+        today = dt_util.as_local(now).date().isoformat()
+        watts = {key: self._watts(data, target) for key, target in self._targets.items()}
+
+        dt = ts - self._last_ts if self._last_ts is not None else None
+        integrate = dt is not None and 0 < dt <= self.max_gap
+        new_day = self._day is not None and self._day != today
+
+        # Share of the interval that lies after local midnight
+        after_midnight = 1.0
+        if integrate and new_day:
+            midnight = dt_util.start_of_local_day(dt_util.as_local(now)).timestamp()
+            after_midnight = min(1.0, max(0.0, (ts - midnight) / dt))
+
+        for key, target in self._targets.items():
+            increment = 0.0
+            previous, current = self._last_watts.get(key), watts[key]
+            if integrate and previous is not None and current is not None:
+                increment = (previous + current) / 2 * dt / 3_600_000
+            if target.daily and new_day:
+                self.totals[key] = increment * after_midnight
+            else:
+                self.totals[key] += increment
+
+        self._last_watts = watts
+        self._last_ts = ts
+        self._day = today
+        return {key: round(total, 4) for key, total in self.totals.items()}
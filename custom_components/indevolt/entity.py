@@ -0,0 +1,32 @@
+from __future__ import annotations
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .const import DOMAIN, SETTING_REGISTERS
+from .utils import get_device_info
+
+class IndevoltSettingEntity(CoordinatorEntity):
+    """Base for number/switch/select entities backed by a writable setting register."""
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, setting: str, name: str):
+        super().__init__(coordinator)
+        self.setting = setting
+        self.read_key = str(SETTING_REGISTERS[setting][0])
+        sn = coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_name = name
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{setting}"
+        self._attr_device_info = get_device_info(coordinator.config_entry)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_entity_keys((self.read_key,)))
+
+    @property
+    def raw_value(self):
+        return self.coordinator.data.get(self.read_key)
+
+    async def async_write(self, value: int) -> None:
+        try:
+            await self.coordinator.async_write_setting(self.setting, value)
+        except (ConnectionError, ValueError) as err:
+            raise HomeAssistantError(f"Failed to set {self.name}: {err}") from err
@@ -0,0 +1,121 @@
+"""Remaining-time estimates from a rolling SOC regression, updated in O(1) per poll."""
+from __future__ import annotations
+from array import array
+from typing import Any, Dict
+
+CHARGING = 1001
+DISCHARGING = 1002
+ESTIMATE_KEYS = ("time_to_full", "time_to_backup_soc", "charge_discharge_end")
+# Rebase the time origin once samples are this far from it, to keep the sums well-conditioned
+REBASE_AFTER = 86400.0
+
+class RollingRegression:
+    """Least-squares slope and mean over a sliding window, with running sums instead of refits."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.xs = array("d", [0.0]) * size
+        self.ys = array("d", [0.0]) * size
+        self.clear()
+
+    def clear(self) -> None:
+        self.count = 0
+        self.index = 0
+        self.origin: float | None = None
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        if self.origin is None:
+            self.origin = x
+        x -= self.origin
+        if self.count == self.size:
+            # Window full: the slot to overwrite holds the oldest sample
+            self._subtract(self.xs[self.index], self.ys[self.index])
+        else:
+            self.count += 1
+        self.xs[self.index], self.ys[self.index] = x, y
+        self._add(x, y)
+        self.index = (self.index + 1) % self.size
+        if x > REBASE_AFTER:
+            self._rebase()
+
+    @property
+    def slope(self) -> float | None:
+        if self.count < 3:
+            return None
+        denominator = self.count * self.sxx - self.sx * self.sx
+        if denominator <= 0:
+            return None
+        return (self.count * self.sxy - self.sx * self.sy) / denominator
+
+    @property
+    def mean(self) -> float | None:
+        return self.sy / self.count if self.count else None
+
+    def _add(self, x: float, y: float) -> None:
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def _subtract(self, x: float, y: float) -> None:
+        self.sx -= x
+        self.sy -= y
+        self.sxx -= x * x
+        self.sxy -= x * y
+
+    def _rebase(self) -> None:
+        """Move the origin to the oldest sample and recompute the sums (rare, O(window))."""
+        oldest = self.index if self.count == self.size else 0
+        shift = self.xs[oldest]
+        self.origin += shift
+        self.sx = self.sy = self.sxx = self.sxy = 0.0
+        for i in range(self.count):
+            self.xs[i] -= shift
+            self._add(self.xs[i], self.ys[i])
+
+class SocEstimator:
+    """Time to full, time to backup SOC and end of the running charge/discharge."""
+
+    def __init__(self, window: int):
+        self.soc = RollingRegression(window)
+        self.power = RollingRegression(window)
+        self.state: int | None = None
+
+    def update(self, ts: float, data: Dict[str, Any], backup_soc: float) -> Dict[str, Any]:
+        """Add this poll's values and return the estimates (minutes, end as epoch seconds)."""
+        result: Dict[str, Any] = dict.fromkeys(ESTIMATE_KEYS)
+        soc, power, state = data.get("6002"), data.get("6000"), data.get("6001")
+        if state not in (CHARGING, DISCHARGING) or not isinstance(soc, (int, float)):
+            self.state = None
+            return result
+        if state != self.state:
+            # Direction changed: the old slope says nothing about the new one
+            self.soc.clear()
+            self.power.clear()
+            self.state = state
+        self.soc.add(ts, soc)
+        if isinstance(power, (int, float)):
+            self.power.add(ts, abs(power))
+
+        rate = self._rate(data.get("142"))  # SOC % per second, always positive
+        if not rate:
+            return result
+        if state == CHARGING:
+            remaining = max(0.0, 100 - soc) / rate
+            result["time_to_full"] = round(remaining / 60, 1)
+        else:
+            remaining = max(0.0, soc - backup_soc) / rate
+            result["time_to_backup_soc"] = round(remaining / 60, 1)
+        result["charge_discharge_end"] = ts + remaining
+        return result
+
+    def _rate(self, capacity) -> float | None:
+        """SOC rate from the regression; from the mean power and capacity while SOC hasn't visibly moved."""
+        sign = 1 if self.state == CHARGING else -1
+        slope = self.soc.slope
+        if slope is not None and slope * sign > 0:
+            return slope * sign
+        if self.power.mean and isinstance(capacity, (int, float)) and capacity > 0:
+            return self.power.mean / (capacity * 1000 * 3600) * 100
+        return None
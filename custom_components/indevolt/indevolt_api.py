@@ -1,185 +1,272 @@
-import asyncio, aiohttp, json
-from typing import Dict, Any, List
-
-class IndevoltAPI:
-    def __init__(self, host: str, port: int, session: aiohttp.ClientSession):
-        self.host, self.port, self.session = host, port, session
-        self.base_url = f"http://{host}:{port}/rpc"
-
-    async def fetch_data(self, keys: List[int], batch_size: int = 65) -> Dict[str, Any]:
-        """Fetch data from specific registers, batching requests if needed."""
-        import logging
-        _LOGGER = logging.getLogger(__name__)
-        
-        # If keys fit in one batch, use original behavior
-        if len(keys) <= batch_size:
-            config = json.dumps({"t": keys}).replace(" ", "")
-            try:
-                timeout = aiohttp.ClientTimeout(total=15)
-                async with self.session.post(f"{self.base_url}/Indevolt.GetData?config={config}", timeout=timeout) as resp:
-                    return await resp.json() if resp.status == 200 else {}
-            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-                _LOGGER.debug(f"Device offline or unreachable: {type(e).__name__}")
-                return {}
-            except Exception as e:
-                _LOGGER.debug(f"Error fetching data: {type(e).__name__}: {str(e)}")
-                return {}
-        
-        # Split into batches and combine results
-        combined_data = {}
-        batch_num = 0
-        for i in range(0, len(keys), batch_size):
-            batch_num += 1
-            batch = keys[i:i + batch_size]
-            config = json.dumps({"t": batch}).replace(" ", "")
-            try:
-                timeout = aiohttp.ClientTimeout(total=15)
-                async with self.session.post(f"{self.base_url}/Indevolt.GetData?config={config}", timeout=timeout) as resp:
-                    if resp.status == 200:
-                        batch_data = await resp.json()
-                        _LOGGER.debug(f"Batch {batch_num}: Requested {len(batch)} keys, received {len(batch_data)} values")
-                        _LOGGER.debug(f"Batch {batch_num} keys: {batch[:5]}...{batch[-3:] if len(batch) > 5 else []}")
-                        
-                        # Check if batch_data keys match what we requested
-                        requested_keys_str = {str(k) for k in batch}
-                        received_keys = set(batch_data.keys())
-                        missing = requested_keys_str - received_keys
-                        if missing:
-                            _LOGGER.debug(f"Batch {batch_num}: Missing keys in response: {sorted(missing)[:10]}")
-                        
-                        combined_data.update(batch_data)
-                    else:
-                        _LOGGER.debug(f"Batch {batch_num}: API returned status {resp.status}")
-            except (aiohttp.ClientError, asyncio.TimeoutError):
-                _LOGGER.debug(f"Batch {batch_num}: Device offline or unreachable")
-                # Continue with other batches even if one fails
-                pass
-            except Exception as e:
-                _LOGGER.debug(f"Batch {batch_num}: Error occurred: {type(e).__name__}")
-                # Continue with other batches even if one fails
-                pass
-        
-        if combined_data:
-            _LOGGER.debug(f"Total data combined: {len(combined_data)} values from {batch_num} batches")
-        return combined_data
-
-    async def set_data(self, f: int, t: int, v: list) -> dict:
-        """Write data to registers."""
-        import logging
-        _LOGGER = logging.getLogger(__name__)
-        
-        config = json.dumps({"f": f, "t": t, "v": v}).replace(" ", "")
-        try:
-            timeout = aiohttp.ClientTimeout(total=15)
-            async with self.session.post(f"{self.base_url}/Indevolt.SetData?config={config}", timeout=timeout) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                else:
-                    _LOGGER.warning(f"Failed to set data: API returned status {resp.status}")
-                    return {}
-        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
-            _LOGGER.error(f"Device offline or unreachable when trying to set data: {type(e).__name__}")
-            raise ConnectionError(f"Cannot connect to device at {self.host}:{self.port}") from e
-        except Exception as e:
-            _LOGGER.error(f"Error setting data: {type(e).__name__}: {str(e)}")
-            raise
-
-    async def async_charge(self, p, s=100, m=1200):
-        """Set to Real-Time Mode then Charge (Register 47015: State 1)."""
-        # Note: Ideally switch to Mode 4 first, but this command handles the charge action
-        return await self.set_data(16, 47015, [1, min(p, m), s])
-
-    async def async_discharge(self, p, s=5, m=800):
-        """Set to Real-Time Mode then Discharge (Register 47015: State 2)."""
-        return await self.set_data(16, 47015, [2, min(p, m), s])
-
-    async def async_stop(self):
-        """Stop charging/discharging (Register 47015: State 0)."""
-        return await self.set_data(16, 47015, [0, 0, 0])
-
-    async def async_set_mode(self, mode: int):
-        """
-        Set the device working mode (Register 47005).
-        1: Self-consumed prioritized
-        4: Real-time control
-        5: Charge/Discharge Schedule        
-        """
-        return await self.set_data(16, 47005, [mode])
-
-    async def async_set_backup_soc(self, soc: int):
-        """
-        Set Backup SOC (minimum reserve SOC).
-        Register: 1142
-        Valid range: 5–100
-        """
-        soc = int(soc)
-        if soc < 5 or soc > 100:
-            raise ValueError("Backup SOC must be between 5 and 100")
-
-        return await self.set_data(16, 1142, [soc])
-        
-    async def async_set_ac_output_power(self, ac_output_power: int):
-        """
-        Set AC Output Power.
-        Register: 1147
-        Valid range: 0–2400
-        """
-        ac_output_power = int(ac_output_power)
-        if ac_output_power < 0 or ac_output_power > 2400:
-            raise ValueError("AC Output power must be between 50 and 2400")
-
-        return await self.set_data(16, 1147, [ac_output_power]) 
-        
-    async def async_set_feed_in_power(self, feed_in_power: int):
-        """
-        Set Feed-In Power.
-        Register: 1146
-        Valid range: 0–2400
-        """
-        feed_in_power = int(feed_in_power)
-        if feed_in_power < 0 or feed_in_power > 2400:
-            raise ValueError("Feed-In power must be between 50 and 2400")
-
-        return await self.set_data(16, 1146, [feed_in_power]) 
-        
-    async def async_set_grid_charging(self, grid_charging: int):
-        """
-        Enable/Disable Grid Charging.
-        Register: 1143
-        Value: 0/1
-        """
-        grid_charging = int(grid_charging)
-
-        return await self.set_data(16, 1143, [grid_charging]) 
-        
-    async def async_set_inverter_input_power(self, inverter_input_power: int):
-        """
-        Set Inverter Input Power.
-        Register: 1138
-        Valid range: 0–2400
-        """
-        inverter_input_power = int(inverter_input_power)
-        if inverter_input_power < 0 or inverter_input_power > 2400:
-            raise ValueError("Inverter Input power must be between 0 and 2400")
-
-        return await self.set_data(16, 1138, [inverter_input_power])         
-        
-    async def async_set_bypass_socket(self, bypass_socket: int):
-        """
-        Enable/Disable Bypass Socket.
-        Register: 7266
-        Value: 0/1
-        """
-        bypass_socket = int(bypass_socket)
-
-        return await self.set_data(16, 7266, [bypass_socket])
-        
-    async def async_set_led_light(self, led_light: int):
-        """
-        Enable/Disable LED Light.
-        Register: 7265
-        Value: 0/1
-        """
-        led_light = int(led_light)
-
-        return await self.set_data(16, 7265, [led_light])
+import asyncio, aiohttp, json, logging, time
+from contextlib import asynccontextmanager, nullcontext
+from dataclasses import dataclass
+from typing import Dict, Any, List, Set
+from .scheduler import PRIORITY_READ, PRIORITY_WRITE, RequestScheduler
+
+_LOGGER = logging.getLogger(__name__)
+
+@dataclass(eq=False)
+class _Read:
+    """One GetData request; other callers may add keys until it is sent."""
+    keys: List[int]
+    limit: int
+    future: asyncio.Future
+    sent: bool = False
+    task: asyncio.Task | None = None  # Sends the request; independent of the caller that created it
+
+class IndevoltAPI:
+    def __init__(self, host: str, port: int, session: aiohttp.ClientSession, scheduler: RequestScheduler | None = None):
+        self.host, self.port, self.session = host, port, session
+        self.base_url = f"http://{host}:{port}/rpc"
+        # Optional per-device scheduler every request waits for (see scheduler.py)
+        self.scheduler = scheduler
+        # Request counters and latencies (time on the wire, without queueing)
+        self.stats = {
+            "reads": 0, "read_failures": 0, "read_seconds": 0.0, "last_read_seconds": None,
+            "writes": 0, "write_failures": 0, "write_seconds": 0.0, "last_write_seconds": None,
+            "coalesced_reads": 0,
+        }
+        # Pending and in-flight reads, and the read each register is currently part of
+        self._reads: List[_Read] = []
+        self._inflight: Dict[int, _Read] = {}
+        # Profile session timing response decoding (set by the coordinator while profiling)
+        self.profile = None
+
+    def _slot(self, priority: int):
+        return self.scheduler.slot(priority) if self.scheduler is not None else nullcontext()
+
+    @asynccontextmanager
+    async def _post(self, kind: str, url: str, timeout: aiohttp.ClientTimeout):
+        """POST and record the request in stats ("read"/"write"); a non-200 status counts as failure."""
+        started = time.monotonic()
+        ok = False
+        try:
+            async with self.session.post(url, timeout=timeout) as resp:
+                yield resp
+                ok = resp.status == 200
+        finally:
+            elapsed = time.monotonic() - started
+            self.stats[f"{kind}s"] += 1
+            self.stats[f"{kind}_seconds"] += elapsed
+            self.stats[f"last_{kind}_seconds"] = round(elapsed, 4)
+            if not ok:
+                self.stats[f"{kind}_failures"] += 1
+
+    async def fetch_data(self, keys: List[int], batch_size: int = 65, timeout: float = 15, failed: Set[str] | None = None) -> Dict[str, Any]:
+        """Fetch data from specific registers, batching requests if needed.
+
+        Reads are single-flight: registers already in a pending or in-flight
+        request are taken from that request's response, and other registers
+        are added to a request still waiting for its turn if it has room.
+        Keys whose request failed are added to `failed` if given.
+        """
+        wanted = list(dict.fromkeys(keys))
+        joined: Dict[int, _Read] = {}
+        remaining = []
+        for key in wanted:
+            read = self._inflight.get(key)
+            if read is not None:
+                joined[id(read)] = read
+            else:
+                remaining.append(key)
+        # Piggyback on requests that haven't been sent yet
+        for read in self._reads:
+            if not remaining:
+                break
+            room = read.limit - len(read.keys)
+            if read.sent or room <= 0:
+                continue
+            added, remaining = remaining[:room], remaining[room:]
+            read.keys.extend(added)
+            self._inflight.update(dict.fromkeys(added, read))
+            joined[id(read)] = read
+        own = []
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(remaining), batch_size):
+            read = _Read(remaining[i:i + batch_size], batch_size, loop.create_future())
+            self._reads.append(read)
+            self._inflight.update(dict.fromkeys(read.keys, read))
+            # A task of its own, so cancelling this caller doesn't cancel a response other callers share
+            read.task = loop.create_task(self._send(read, timeout))
+            own.append(read)
+        self.stats["coalesced_reads"] += len(joined)
+
+        reads = [*own, *joined.values()]
+        results = await asyncio.gather(
+            *(asyncio.shield(read.future) for read in own),
+            *(self._join(read, timeout) for read in joined.values()),
+        )
+        requested = {str(key) for key in wanted}
+        data = {}
+        for read, result in zip(reads, results):
+            # A response without any value (like a failed request) says nothing about its keys
+            if not result:
+                if failed is not None:
+                    failed.update(str(key) for key in read.keys if str(key) in requested)
+                continue
+            data.update((key, value) for key, value in result.items() if key in requested)
+        if len(own) > 1:
+            _LOGGER.debug("Combined %d values from %d batches", len(data), len(own))
+        return data
+
+    @staticmethod
+    async def _join(read: _Read, timeout: float) -> Dict[str, Any] | None:
+        """Wait for another caller's request, but no longer than this caller's own timeout (None if it took longer)."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(read.future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def _send(self, read: _Read, timeout: float) -> Dict[str, Any] | None:
+        """Send one GetData request and resolve its future for every caller waiting on it (None on failure)."""
+        result = None
+        try:
+            # Each request waits for its own turn, so queued writes go out between batches
+            async with self._slot(PRIORITY_READ):
+                # Keys are frozen from here on; later callers start a new request
+                read.sent = True
+                config = json.dumps({"t": read.keys}).replace(" ", "")
+                async with self._post("read", f"{self.base_url}/Indevolt.GetData?config={config}", aiohttp.ClientTimeout(total=timeout)) as resp:
+                    if resp.status == 200:
+                        body = await resp.read()
+                        with self.profile.span("decode_json") if self.profile is not None else nullcontext():
+                            result = json.loads(body)
+                        missing = {str(key) for key in read.keys} - set(result)
+                        if missing:
+                            _LOGGER.debug("Missing keys in response: %s", sorted(missing, key=int)[:10])
+                    else:
+                        _LOGGER.debug("API returned status %s", resp.status)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.debug("Device offline or unreachable: %s", type(e).__name__)
+        except Exception as e:
+            _LOGGER.debug("Error fetching data: %s: %s", type(e).__name__, e)
+        finally:
+            self._reads.remove(read)
+            for key in read.keys:
+                if self._inflight.get(key) is read:
+                    del self._inflight[key]
+            if not read.future.done():
+                read.future.set_result(result)
+        return result
+
+    async def set_data(self, f: int, t: int, v: list) -> dict:
+        """Write data to registers."""
+        import logging
+        _LOGGER = logging.getLogger(__name__)
+        
+        config = json.dumps({"f": f, "t": t, "v": v}).replace(" ", "")
+        try:
+            timeout = aiohttp.ClientTimeout(total=15)
+            async with self._slot(PRIORITY_WRITE), self._post("write", f"{self.base_url}/Indevolt.SetData?config={config}", timeout) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                else:
+                    _LOGGER.warning(f"Failed to set data: API returned status {resp.status}")
+                    return {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _LOGGER.error(f"Device offline or unreachable when trying to set data: {type(e).__name__}")
+            raise ConnectionError(f"Cannot connect to device at {self.host}:{self.port}") from e
+        except Exception as e:
+            _LOGGER.error(f"Error setting data: {type(e).__name__}: {str(e)}")
+            raise
+
+    async def async_charge(self, p, s=100, m=1200):
+        """Set to Real-Time Mode then Charge (Register 47015: State 1)."""
+        # Note: Ideally switch to Mode 4 first, but this command handles the charge action
+        return await self.set_data(16, 47015, [1, min(p, m), s])
+
+    async def async_discharge(self, p, s=5, m=800):
+        """Set to Real-Time Mode then Discharge (Register 47015: State 2)."""
+        return await self.set_data(16, 47015, [2, min(p, m), s])
+
+    async def async_stop(self):
+        """Stop charging/discharging (Register 47015: State 0)."""
+        return await self.set_data(16, 47015, [0, 0, 0])
+
+    async def async_set_mode(self, mode: int):
+        """
+        Set the device working mode (Register 47005).
+        1: Self-consumed prioritized
+        4: Real-time control
+        5: Charge/Discharge Schedule        
+        """
+        return await self.set_data(16, 47005, [mode])
+
+    async def async_set_backup_soc(self, soc: int):
+        """
+        Set Backup SOC (minimum reserve SOC).
+        Register: 1142
+        Valid range: 5–100
+        """
+        soc = int(soc)
+        if soc < 5 or soc > 100:
+            raise ValueError("Backup SOC must be between 5 and 100")
+
+        return await self.set_data(16, 1142, [soc])
+        
+    async def async_set_ac_output_power(self, ac_output_power: int):
+        """
+        Set AC Output Power.
+        Register: 1147
+        Valid range: 0–2400
+        """
+        ac_output_power = int(ac_output_power)
+        if ac_output_power < 0 or ac_output_power > 2400:
+            raise ValueError("AC Output power must be between 50 and 2400")
+
+        return await self.set_data(16, 1147, [ac_output_power]) 
+        
+    async def async_set_feed_in_power(self, feed_in_power: int):
+        """
+        Set Feed-In Power.
+        Register: 1146
+        Valid range: 0–2400
+        """
+        feed_in_power = int(feed_in_power)
+        if feed_in_power < 0 or feed_in_power > 2400:
+            raise ValueError("Feed-In power must be between 50 and 2400")
+
+        return await self.set_data(16, 1146, [feed_in_power]) 
+        
+    async def async_set_grid_charging(self, grid_charging: int):
+        """
+        Enable/Disable Grid Charging.
+        Register: 1143
+        Value: 0/1
+        """
+        grid_charging = int(grid_charging)
+
+        return await self.set_data(16, 1143, [grid_charging]) 
+        
+    async def async_set_inverter_input_power(self, inverter_input_power: int):
+        """
+        Set Inverter Input Power.
+        Register: 1138
+        Valid range: 0–2400
+        """
+        inverter_input_power = int(inverter_input_power)
+        if inverter_input_power < 0 or inverter_input_power > 2400:
+            raise ValueError("Inverter Input power must be between 0 and 2400")
+
+        return await self.set_data(16, 1138, [inverter_input_power])         
+        
+    async def async_set_bypass_socket(self, bypass_socket: int):
+        """
+        Enable/Disable Bypass Socket.
+        Register: 7266
+        Value: 0/1
+        """
+        bypass_socket = int(bypass_socket)
+
+        return await self.set_data(16, 7266, [bypass_socket])
+        
+    async def async_set_led_light(self, led_light: int):
+        """
+        Enable/Disable LED Light.
+        Register: 7265
+        Value: 0/1
+        """
+        led_light = int(led_light)
+
+        return await self.set_data(16, 7265, [led_light])
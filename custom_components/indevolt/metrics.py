@@ -0,0 +1,108 @@
+"""OpenMetrics exposition of register values and client statistics of all devices."""
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.helpers.http import KEY_HASS
+from .const import DOMAIN
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+# (family, type, help, sample suffix)
+FAMILIES: Tuple[Tuple[str, str, str, str], ...] = (
+    ("indevolt_register", "gauge", "Raw register value from the last poll", ""),
+    ("indevolt_polls", "counter", "Coordinator polls", "_total"),
+    ("indevolt_poll_failures", "counter", "Polls without any data", "_total"),
+    ("indevolt_poll_duration_seconds", "counter", "Time spent in polls", "_total"),
+    ("indevolt_last_poll_duration_seconds", "gauge", "Duration of the last poll", ""),
+    ("indevolt_read_requests", "counter", "GetData requests (batches)", "_total"),
+    ("indevolt_read_failures", "counter", "Failed GetData requests", "_total"),
+    ("indevolt_read_duration_seconds", "counter", "Time spent in GetData requests", "_total"),
+    ("indevolt_coalesced_reads", "counter", "Reads served by another caller's pending or in-flight GetData request", "_total"),
+    ("indevolt_write_requests", "counter", "SetData requests", "_total"),
+    ("indevolt_write_failures", "counter", "Failed SetData requests", "_total"),
+    ("indevolt_write_duration_seconds", "counter", "Time spent in SetData requests", "_total"),
+    ("indevolt_last_write_duration_seconds", "gauge", "Duration of the last SetData request", ""),
+    ("indevolt_request_queue_depth", "gauge", "Requests waiting in the device scheduler", ""),
+    ("indevolt_rejected_samples", "counter", "Register values rejected by the plausibility filter", "_total"),
+)
+
+def _labels(coordinator) -> str:
+    entry = coordinator.config_entry
+    return f'sn="{entry.data.get("sn", "unknown")}",entry_id="{entry.entry_id}"'
+
+def _register_samples(coordinator) -> List[str]:
+    """Numeric register values of one device."""
+    labels = _labels(coordinator)
+    return [
+        f'indevolt_register{{{labels},register="{key}"}} {value}'
+        for key, value in (coordinator.data or {}).items()
+        if key.isdigit() and isinstance(value, (int, float)) and not isinstance(value, bool)
+    ]
+
+def _client_samples(coordinator) -> Dict[str, List[str]]:
+    """Poll, request and queue metrics of one device; these move between polls, so they are never cached."""
+    labels = _labels(coordinator)
+    api, poll = coordinator.api.stats, coordinator.poll_stats
+    values: Dict[str, Any] = {
+        "indevolt_polls": poll["polls"],
+        "indevolt_poll_failures": poll["poll_failures"],
+        "indevolt_poll_duration_seconds": poll["poll_seconds"],
+        "indevolt_last_poll_duration_seconds": poll["last_poll_seconds"],
+        "indevolt_read_requests": api["reads"],
+        "indevolt_read_failures": api["read_failures"],
+        "indevolt_read_duration_seconds": api["read_seconds"],
+        "indevolt_coalesced_reads": api["coalesced_reads"],
+        "indevolt_write_requests": api["writes"],
+        "indevolt_write_failures": api["write_failures"],
+        "indevolt_write_duration_seconds": api["write_seconds"],
+        "indevolt_last_write_duration_seconds": api["last_write_seconds"],
+        "indevolt_request_queue_depth": coordinator.scheduler.depth,
+    }
+    samples = {
+        family: [f"{family}{suffix}{{{labels}}} {round(values[family], 6)}"]
+        for family, _, _, suffix in FAMILIES[1:]
+        if values.get(family) is not None
+    }
+    rejected = coordinator.plausibility.rejected
+    samples["indevolt_rejected_samples"] = [
+        f'indevolt_rejected_samples_total{{{labels},reason="{reason}"}} {rejected[reason]}' for reason in ("range", "rate", "spike")
+    ]
+    return samples
+
+class IndevoltMetricsView(HomeAssistantView):
+    """/api/indevolt/metrics in OpenMetrics text format."""
+
+    url = "/api/indevolt/metrics"
+    name = "api:indevolt:metrics"
+    requires_auth = True
+
+    def __init__(self) -> None:
+        # entry_id -> (coordinator data_version, register lines); rebuilt only when that device's data changed
+        self._registers: Dict[str, Tuple[int, List[str]]] = {}
+
+    async def get(self, request: web.Request) -> web.Response:
+        coordinators = list(request.app[KEY_HASS].data.get(DOMAIN, {}).values())
+        registers: List[str] = []
+        for coordinator in coordinators:
+            entry_id = coordinator.config_entry.entry_id
+            cached = self._registers.get(entry_id)
+            if cached is None or cached[0] != coordinator.data_version:
+                cached = self._registers[entry_id] = (coordinator.data_version, _register_samples(coordinator))
+            registers.extend(cached[1])
+        # Forget unloaded devices
+        for entry_id in set(self._registers) - {coordinator.config_entry.entry_id for coordinator in coordinators}:
+            del self._registers[entry_id]
+
+        clients = [_client_samples(coordinator) for coordinator in coordinators]
+        lines: List[str] = []
+        for family, metric_type, help_text, _ in FAMILIES:
+            lines.append(f"# TYPE {family} {metric_type}")
+            lines.append(f"# HELP {family} {help_text}")
+            if family == "indevolt_register":
+                lines.extend(registers)
+            else:
+                for samples in clients:
+                    lines.extend(samples.get(family, ()))
+        lines.append("# EOF\n")
+        return web.Response(body="\n".join(lines), headers={"Content-Type": CONTENT_TYPE})
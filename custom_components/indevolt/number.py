@@ -0,0 +1,39 @@
+from __future__ import annotations
+import logging
+from homeassistant.components.number import NumberDeviceClass, NumberEntity, NumberMode
+from homeassistant.const import PERCENTAGE, UnitOfPower
+from .const import DOMAIN, SETTING_REGISTERS
+from .entity import IndevoltSettingEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+# setting, name, unit, device class, step
+NUMBERS = (
+    ("backup_soc", "Backup SOC", PERCENTAGE, NumberDeviceClass.BATTERY, 1),
+    ("feed_in_power", "Feed-In Power Limit", UnitOfPower.WATT, NumberDeviceClass.POWER, 10),
+    ("ac_output_power", "AC Output Power Limit", UnitOfPower.WATT, NumberDeviceClass.POWER, 10),
+    ("inverter_input_power", "Inverter Input Power Limit", UnitOfPower.WATT, NumberDeviceClass.POWER, 10),
+)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(IndevoltSettingNumberEntity(coordinator, *number) for number in NUMBERS)
+
+class IndevoltSettingNumberEntity(IndevoltSettingEntity, NumberEntity):
+    _attr_mode = NumberMode.BOX
+
+    def __init__(self, coordinator, setting, name, unit, device_class, step):
+        super().__init__(coordinator, setting, name)
+        _, _, low, high = SETTING_REGISTERS[setting]
+        self._attr_native_min_value = low
+        self._attr_native_max_value = high
+        self._attr_native_step = step
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_class = device_class
+
+    @property
+    def native_value(self):
+        return self.raw_value
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self.async_write(int(value))
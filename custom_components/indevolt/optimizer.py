@@ -0,0 +1,81 @@
+"""Price-aware charge/discharge schedule optimization (dynamic programming over SOC and time)."""
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence
+import numpy as np
+
+SOC_LEVELS = np.arange(101)  # 1 % SOC resolution
+ACTION_IDLE = "idle"
+ACTION_CHARGE = "charge"
+ACTION_DISCHARGE = "discharge"
+
+def optimize_schedule(
+    prices: Sequence[float],
+    slot_hours: float,
+    capacity_kwh: float,
+    soc: float,
+    min_soc: float,
+    max_charge_power: float,
+    max_discharge_power: float,
+    load: Sequence[float] | None = None,
+    feed_in_price: float | None = None,
+    efficiency: float = 0.9,
+) -> Dict[str, Any]:
+    """Return the cheapest SOC trajectory for the given slot prices.
+
+    `load` is the forecast net consumption (load minus PV) per slot in W;
+    without it, discharged energy is valued at the slot price (arbitrage).
+    Energy left in the battery at the end is valued at the mean price, so
+    the plan doesn't empty the battery just because the horizon ends.
+    """
+    prices = np.asarray(prices, dtype=float)
+    slots = len(prices)
+    net = np.zeros(slots) if load is None else np.asarray(load, dtype=float) * slot_hours / 1000
+    export = prices if feed_in_price is None else np.full(slots, float(feed_in_price))
+
+    start = int(round(min(max(soc, 0), 100)))
+    lower = min(int(np.ceil(min_soc)), start)
+    step_kwh = capacity_kwh / 100
+
+    # [from, to] battery energy change and the AC-side energy it takes or delivers
+    delta = (SOC_LEVELS[None, :] - SOC_LEVELS[:, None]) * step_kwh
+    ac = np.where(delta > 0, delta / efficiency, delta * efficiency)
+    feasible = (
+        (ac <= max_charge_power * slot_hours / 1000)
+        & (-ac <= max_discharge_power * slot_hours / 1000)
+        & (SOC_LEVELS >= lower)[None, :]
+    )
+
+    # Backward pass: value[j] = cheapest cost from SOC level j to the end of the horizon
+    value = -SOC_LEVELS * step_kwh * efficiency * prices.mean()
+    choice = np.empty((slots, len(SOC_LEVELS)), dtype=np.int16)
+    rows = np.arange(len(SOC_LEVELS))
+    for t in range(slots - 1, -1, -1):
+        grid = net[t] + ac
+        cost = np.where(grid > 0, grid * prices[t], grid * export[t])
+        total = np.where(feasible, cost + value[None, :], np.inf)
+        choice[t] = total.argmin(axis=1)
+        value = total[rows, choice[t]]
+
+    # Forward pass along the chosen transitions
+    plan: List[Dict[str, Any]] = []
+    level = start
+    for t in range(slots):
+        target = int(choice[t, level])
+        energy = float(ac[level, target])
+        power = int(round(abs(energy) / slot_hours * 1000))
+        if target > level:
+            action = ACTION_CHARGE
+        elif target < level:
+            action = ACTION_DISCHARGE
+        else:
+            action, power = ACTION_IDLE, 0
+        plan.append({"action": action, "power": power, "soc": target})
+        level = target
+
+    baseline = np.where(net > 0, net * prices, net * export).sum()
+    cost = float(value[start] + start * step_kwh * efficiency * prices.mean())
+    return {
+        "slots": plan,
+        "cost": round(cost, 4),
+        "baseline_cost": round(float(baseline), 4),
+    }
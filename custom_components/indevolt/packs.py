@@ -0,0 +1,78 @@
+"""Battery pack register tables (Main Unit and Slave Units) for runtime pack discovery."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Final
+
+@dataclass(frozen=True)
+class BatteryPack:
+    index: int
+    name: str
+    probe_key: str  # Serial number register; answers with a non-empty value only if the pack exists
+    keys: Dict[str, str]  # PACK_SENSOR_TEMPLATE kind -> register
+
+# Registers per pack and template kind. Kinds a pack doesn't have (or whose register
+# is unknown/duplicated in the vendor documentation) are simply left out.
+PACKS: Final = (
+    BatteryPack(0, "Main Unit", "150", {
+        "soc": "6009", "soh": "9002", "voltage": "9004", "cell_1_voltage": "9005", "cell_2_voltage": "9007",
+        "average_cell_voltage": "9009", "module_temperature": "9010", "battery_temperature": "9012",
+        "battery_temperature_1": "11041", "voltage_difference": "11040", "mos_temperature": "11042",
+        "dcdc_bus_voltage": "9071", "dcdc_voltage": "9074", "dcdc_current": "9075", "dcdc_power": "9076",
+        "dcdc_temperature_1": "9077", "dcdc_temperature_2": "9078", "heating_temperature": "9081",
+        "heating_power": "9082", "battery_current": "9013",
+        "dcdc_state": "9079", "heating_state": "9080", "mos_state": "11043",
+        "dcdc_version": "1120", "bms_version": "1109", "sn": "150",
+    }),
+    BatteryPack(1, "Slave Unit 1", "9032", {
+        "soc": "9016", "soh": "9018", "voltage": "9020", "cell_1_voltage": "9021", "cell_2_voltage": "9023",
+        "average_cell_voltage": "9025", "battery_temperature": "9084", "max_battery_temperature": "9026",
+        "min_cell_temperature": "9028", "average_battery_temperature": "9030", "voltage_difference": "9083",
+        "mos_temperature": "9085", "dcdc_bus_voltage": "9087", "dcdc_voltage": "9090", "dcdc_current": "9091",
+        "dcdc_power": "9092", "dcdc_temperature_1": "9093", "dcdc_temperature_2": "9094",
+        "heating_temperature": "9097", "heating_power": "9098", "battery_current": "19173",
+        "dcdc_state": "9095", "heating_state": "9096", "mos_state": "9086",
+        "dcdc_version": "1136", "bms_version": "1137", "sn": "9032",
+    }),
+    # Slave Units 2-4: documented version registers (1138-1143) overlap the settings
+    # registers (backup SOC, grid charging, ...) and are not polled.
+    BatteryPack(2, "Slave Unit 2", "9051", {
+        "soc": "9035", "soh": "9037", "voltage": "9039", "cell_1_voltage": "9040", "cell_2_voltage": "9042",
+        "average_cell_voltage": "9044", "battery_temperature": "9100", "max_battery_temperature": "9045",
+        "min_cell_temperature": "9047", "average_battery_temperature": "9049", "voltage_difference": "9099",
+        "mos_temperature": "9101", "dcdc_bus_voltage": "9103", "dcdc_voltage": "9106", "dcdc_current": "9107",
+        "dcdc_power": "9108", "dcdc_temperature_1": "9109", "dcdc_temperature_2": "9110",
+        "heating_temperature": "9113", "heating_power": "9114", "battery_current": "19174",
+        "dcdc_state": "9111", "heating_state": "9112", "mos_state": "9102", "sn": "9051",
+    }),
+    BatteryPack(3, "Slave Unit 3", "9070", {
+        "soc": "9054", "soh": "9056", "voltage": "9058", "cell_1_voltage": "9059", "cell_2_voltage": "9061",
+        "average_cell_voltage": "9063", "battery_temperature": "9116", "max_battery_temperature": "9064",
+        "min_cell_temperature": "9066", "average_battery_temperature": "9068", "voltage_difference": "9115",
+        "mos_temperature": "9117", "dcdc_bus_voltage": "9119", "dcdc_voltage": "9122", "dcdc_current": "9123",
+        "dcdc_power": "9124", "dcdc_temperature_1": "9125", "dcdc_temperature_2": "9126",
+        "heating_temperature": "9129", "heating_power": "9130", "battery_current": "19175",
+        "dcdc_state": "9127", "heating_state": "9128", "mos_state": "9118", "sn": "9070",
+    }),
+    BatteryPack(4, "Slave Unit 4", "9165", {
+        "soc": "9149", "soh": "9151", "voltage": "9153", "cell_1_voltage": "9154", "cell_2_voltage": "9156",
+        "average_cell_voltage": "9158", "battery_temperature": "9132", "max_battery_temperature": "9159",
+        "min_cell_temperature": "9161", "average_battery_temperature": "9163", "voltage_difference": "9131",
+        "mos_temperature": "9133", "dcdc_bus_voltage": "9135", "dcdc_voltage": "9138", "dcdc_current": "9139",
+        "dcdc_power": "9140", "dcdc_temperature_1": "9141", "dcdc_temperature_2": "9142",
+        "heating_temperature": "9145", "heating_power": "9146", "battery_current": "19176",
+        "dcdc_state": "9143", "heating_state": "9144", "mos_state": "9134", "sn": "9165",
+    }),
+    BatteryPack(5, "Slave Unit 5", "9218", {
+        "soc": "9202", "soh": "9204", "voltage": "9206", "cell_1_voltage": "9208", "cell_2_voltage": "9210",
+        "average_cell_voltage": "9211", "battery_temperature": "9216", "max_battery_temperature": "9212",
+        "min_cell_temperature": "9214", "voltage_difference": "9268", "mos_temperature": "9270",
+        "dcdc_bus_voltage": "9272", "dcdc_voltage": "9273", "dcdc_current": "9274", "dcdc_power": "9275",
+        "dcdc_temperature_1": "9276", "dcdc_temperature_2": "9277", "heating_temperature": "9280",
+        "dcdc_state": "9278", "heating_state": "9279", "mos_state": "9271",
+        "dcdc_version": "1098", "bms_version": "1099", "sn": "9218",
+    }),
+)
+
+def pack_present(value) -> bool:
+    """Return True if a probe register answered with a real serial number."""
+    return value not in (None, "", 0, "0")
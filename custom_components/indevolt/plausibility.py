@@ -0,0 +1,120 @@
+"""Plausibility filter for measurement registers: range, rate of change and rolling-median spike rejection."""
+from __future__ import annotations
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+
+@dataclass(frozen=True)
+class Plausibility:
+    minimum: float
+    maximum: float
+    max_rate: Optional[float]  # Units per second, None for values that may step instantly
+    spike: float  # Maximum deviation from the rolling median
+
+# Limits per device class, in sensor units (raw value × coefficient). A register
+# with its own range (register map "range") gets the spike tolerance scaled to it,
+# so the wide default only applies to grid-side registers where big steps are real.
+LIMITS_BY_DEVICE_CLASS: Dict[str, Plausibility] = {
+    SensorDeviceClass.BATTERY: Plausibility(0, 100, 0.5, 10),
+    SensorDeviceClass.POWER: Plausibility(-30000, 30000, None, 15000),
+    SensorDeviceClass.APPARENT_POWER: Plausibility(-30000, 30000, None, 15000),
+    SensorDeviceClass.VOLTAGE: Plausibility(0, 1000, None, 200),
+    SensorDeviceClass.CURRENT: Plausibility(-300, 300, None, 100),
+    SensorDeviceClass.FREQUENCY: Plausibility(0, 70, None, 20),
+    SensorDeviceClass.TEMPERATURE: Plausibility(-40, 120, 1.0, 30),
+}
+
+# The spike tolerance widens to this many median absolute deviations for noisy registers
+SPREAD_FACTOR = 4
+
+def register_limits(desc: Any) -> Plausibility:
+    """Limits of one register: its device class, narrowed to the register's own range if it has one."""
+    limits = LIMITS_BY_DEVICE_CLASS[desc.device_class]
+    if desc.plausible_range is None:
+        return limits
+    minimum, maximum = desc.plausible_range
+    scale = (maximum - minimum) / (limits.maximum - limits.minimum)
+    return Plausibility(minimum, maximum, limits.max_rate, limits.spike * scale)
+
+class PlausibilityFilter:
+    """Validates measurement registers before they reach entities.
+
+    Each register keeps its last accepted value and a fixed-size ring of its
+    recent in-range samples. A sample deviating from the ring's median by more
+    than the spike tolerance (or changing faster than the rate limit) is
+    rejected; if it persists, the median follows it after half the window and
+    the new level is accepted. The tolerance is scaled to the register's range
+    and widened by the recent spread of noisy registers.
+    """
+
+    def __init__(self, descriptions: Iterable[Any], window: int):
+        self.window = window
+        self._limits: Dict[str, tuple[float, Plausibility]] = {
+            desc.key: (desc.coefficient, register_limits(desc))
+            for desc in descriptions
+            if desc.state_class == SensorStateClass.MEASUREMENT and desc.device_class in LIMITS_BY_DEVICE_CLASS
+        }
+        self._rings: Dict[str, array] = {}
+        self._filled: Counter[str] = Counter()
+        self._accepted: Dict[str, tuple[float, float]] = {}  # key -> (time, raw value)
+        # Rejections by reason and by register
+        self.rejected: Counter[str] = Counter()
+        self.rejected_keys: Counter[str] = Counter()
+
+    def apply(self, now: float, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace rejected values in data with the last accepted ones (or drop them); return the rejected raw values."""
+        rejected: Dict[str, Any] = {}
+        for key, (coefficient, limits) in self._limits.items():
+            raw = data.get(key)
+            if not isinstance(raw, (int, float)) or isinstance(raw, bool):
+                continue
+            reason = self._check(key, now, raw * coefficient, coefficient, limits)
+            if reason is None:
+                self._accepted[key] = (now, raw)
+                continue
+            self.rejected[reason] += 1
+            self.rejected_keys[key] += 1
+            rejected[key] = raw
+            if key in self._accepted:
+                data[key] = self._accepted[key][1]
+            else:
+                data.pop(key)
+        return rejected
+
+    def _check(self, key: str, now: float, value: float, coefficient: float, limits: Plausibility) -> Optional[str]:
+        if not limits.minimum <= value <= limits.maximum:
+            return "range"
+
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = array("d", bytes(8 * self.window))
+        ring[self._filled[key] % self.window] = value
+        self._filled[key] += 1
+        filled = min(self._filled[key], self.window)
+        # No verdict until enough samples for a meaningful median
+        if filled < 3:
+            return None
+
+        median = sorted(ring[:filled])[filled // 2]
+        spread = sorted(abs(sample - median) for sample in ring[:filled])[filled // 2]
+        tolerance = max(limits.spike, SPREAD_FACTOR * spread)
+        if abs(value - median) > tolerance:
+            return "spike"
+        last = self._accepted.get(key)
+        if limits.max_rate is not None and last is not None:
+            elapsed = max(now - last[0], 1.0)
+            # A fast change the median already confirms (it persisted) is accepted
+            if abs(value - last[1] * coefficient) > limits.max_rate * elapsed and abs(median - last[1] * coefficient) <= tolerance:
+                return "rate"
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Rejection counts by reason and the registers rejected most often."""
+        return {
+            "range": self.rejected["range"],
+            "rate": self.rejected["rate"],
+            "spike": self.rejected["spike"],
+            "registers": dict(self.rejected_keys.most_common(10)),
+        }
@@ -0,0 +1,43 @@
+"""Settings profiles: validation and minimal register writes."""
+from __future__ import annotations
+from typing import Any, Dict, List, Tuple
+import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
+from .const import SETTING_REGISTERS, WORKING_MODES
+
+def _setting(name: str):
+    _, _, low, high = SETTING_REGISTERS[name]
+    if high == 1:
+        return vol.All(cv.boolean, vol.Coerce(int))
+    return vol.All(vol.Coerce(int), vol.Range(min=low, max=high))
+
+PROFILE_SCHEMA = vol.Schema({
+    **{vol.Optional(name): _setting(name) for name in SETTING_REGISTERS if name != "working_mode"},
+    vol.Optional("working_mode"): vol.All(vol.Lower, vol.In(WORKING_MODES), WORKING_MODES.get),
+})
+
+PROFILES_SCHEMA = vol.Schema({cv.string: PROFILE_SCHEMA})
+
+def read_keys(settings: Dict[str, int]) -> List[int]:
+    """Registers to read for comparing `settings` with the device."""
+    return [SETTING_REGISTERS[name][0] for name in settings]
+
+def diff_settings(settings: Dict[str, int], current: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Return {name: {"from": current, "to": target}} for settings that differ (or can't be read)."""
+    changes = {}
+    for name, target in settings.items():
+        value = current.get(str(SETTING_REGISTERS[name][0]))
+        if value != target:
+            changes[name] = {"from": value, "to": target}
+    return changes
+
+def plan_writes(changes: Dict[str, Dict[str, Any]]) -> List[Tuple[int, List[int]]]:
+    """Group the changed settings into (start register, values) writes of consecutive registers."""
+    targets = sorted((SETTING_REGISTERS[name][1], change["to"]) for name, change in changes.items())
+    writes: List[Tuple[int, List[int]]] = []
+    for register, value in targets:
+        if writes and writes[-1][0] + len(writes[-1][1]) == register:
+            writes[-1][1].append(value)
+        else:
+            writes.append((register, [value]))
+    return writes
@@ -0,0 +1,79 @@
+"""On-demand profiling: timing spans, event-loop lag during polls and an optional cProfile dump."""
+from __future__ import annotations
+import asyncio
+import cProfile
+import io
+import json
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List
+
+LAG_INTERVAL = 0.05
+TOP_FUNCTIONS = 40
+
+def _stats_ms(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "total_ms": round(sum(ordered) * 1000, 2),
+        "avg_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+class ProfileSession:
+    """Durations of named spans and event-loop lag samples collected while a profile runs."""
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.spans: Dict[str, List[float]] = defaultdict(list)
+        self.lag: List[float] = []
+        self.poll_lag: List[float] = []
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans[name].append(time.perf_counter() - started)
+
+    async def async_sample_lag(self, polling: Callable[[], bool]) -> None:
+        """Measure how late short sleeps wake up; samples taken while `polling()` is true are also kept apart."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(LAG_INTERVAL)
+            lag = max(0.0, loop.time() - started - LAG_INTERVAL)
+            self.lag.append(lag)
+            if polling():
+                self.poll_lag.append(lag)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "duration": round(time.monotonic() - self.started, 1),
+            "spans": {name: _stats_ms(values) for name, values in sorted(self.spans.items())},
+            "loop_lag": _stats_ms(self.lag),
+            "loop_lag_during_polls": _stats_ms(self.poll_lag),
+        }
+
+def write_profile(base_path: str, summary: Dict[str, Any], profiler: cProfile.Profile | None) -> List[str]:
+    """Write the summary (plus the top functions) and the raw cProfile dump; return the file paths."""
+    files = []
+    text = json.dumps(summary, indent=2)
+    if profiler is not None:
+        stats_path = f"{base_path}.prof"
+        profiler.dump_stats(stats_path)
+        files.append(stats_path)
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(TOP_FUNCTIONS)
+        text += "\n\n" + output.getvalue()
+    summary_path = f"{base_path}.txt"
+    with open(summary_path, "w", encoding="utf-8") as file:
+        file.write(text)
+    files.insert(0, summary_path)
+    return files
@@ -0,0 +1,48 @@
+"""Local read-through proxy for the device's GetData/SetData RPC, so other clients share the integration's poll."""
+from __future__ import annotations
+import json
+import logging
+from http import HTTPStatus
+from aiohttp import web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.http import KEY_HASS
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+class IndevoltRpcView(HomeAssistantView):
+    """/api/indevolt/<entry_id>/rpc/Indevolt.GetData|SetData?config=... with the device's request/response shape."""
+
+    url = "/api/indevolt/{entry_id}/rpc/{method}"
+    name = "api:indevolt:rpc"
+    requires_auth = True
+
+    async def get(self, request: web.Request, entry_id: str, method: str) -> web.Response:
+        return await self._handle(request, entry_id, method)
+
+    async def post(self, request: web.Request, entry_id: str, method: str) -> web.Response:
+        return await self._handle(request, entry_id, method)
+
+    async def _handle(self, request: web.Request, entry_id: str, method: str) -> web.Response:
+        hass = request.app[KEY_HASS]
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+        if coordinator is None or not coordinator.config_entry.options.get("enable_rpc_proxy", False):
+            return self.json_message("Not found", HTTPStatus.NOT_FOUND)
+
+        try:
+            config = json.loads(request.query["config"])
+            if method == "Indevolt.GetData":
+                keys = [int(key) for key in config["t"]]
+                return self.json(await coordinator.async_proxy_read(keys))
+            if method == "Indevolt.SetData":
+                values = [int(value) for value in config["v"]]
+                return self.json(await coordinator.async_proxy_write(int(config["f"]), int(config["t"]), values))
+        except (KeyError, TypeError, ValueError) as err:
+            return self.json_message(f"Invalid config: {err}", HTTPStatus.BAD_REQUEST)
+        except HomeAssistantError as err:
+            # Refused by the Min-SOC guard
+            return self.json_message(str(err), HTTPStatus.FORBIDDEN)
+        except ConnectionError as err:
+            return self.json_message(str(err), HTTPStatus.BAD_GATEWAY)
+        return self.json_message(f"Unknown method {method}", HTTPStatus.NOT_FOUND)
@@ -0,0 +1,94 @@
+"""Per-model register maps (registers/gen<N>.json), parsed on first use and cached per generation.
+
+A map in the config directory (indevolt_registers/gen<N>.json) is merged
+into the bundled one by register key; entries with "remove": true drop a
+register, and "replace": true at the top level replaces the bundled map
+(third-party or firmware-specific maps).
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from .const import DOMAIN
+from .sensor import IndevoltSensorEntityDescription
+
+_LOGGER = logging.getLogger(__name__)
+
+BUNDLED_DIR = os.path.join(os.path.dirname(__file__), "registers")
+OVERRIDE_DIR = "indevolt_registers"
+TIERS = ("normal", "slow")
+
+@dataclass(frozen=True)
+class RegisterMap:
+    model: str
+    descriptions: Tuple[IndevoltSensorEntityDescription, ...]
+    tiers: Dict[str, str]  # Register -> poll tier
+    files: Tuple[str, ...]  # Files the map was built from
+
+def parse_register(entry: Dict[str, Any]) -> IndevoltSensorEntityDescription:
+    """Build a sensor description from one register map entry."""
+    return IndevoltSensorEntityDescription(
+        key=str(entry["key"]),
+        name=entry["name"],
+        native_unit_of_measurement=entry.get("unit"),
+        device_class=SensorDeviceClass(entry["device_class"]) if "device_class" in entry else None,
+        state_class=SensorStateClass(entry["state_class"]) if "state_class" in entry else None,
+        entity_category=EntityCategory(entry["entity_category"]) if "entity_category" in entry else None,
+        entity_registry_enabled_default=entry.get("enabled", True),
+        coefficient=float(entry.get("coefficient", 1.0)),
+        state_mapping={int(value): state for value, state in entry.get("states", {}).items()},
+        is_string=entry.get("string", False),
+        plausible_range=(float(entry["range"][0]), float(entry["range"][1])) if "range" in entry else None,
+    )
+
+def _read(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+def load_register_map(gen: int, config_dir: str) -> RegisterMap:
+    """Read and parse the map of a generation (blocking)."""
+    path = os.path.join(BUNDLED_DIR, f"gen{gen}.json")
+    bundled = _read(path)
+    model = bundled.get("model", "")
+    entries: Dict[str, Dict[str, Any]] = {str(entry["key"]): entry for entry in bundled["registers"]}
+    files: List[str] = [path]
+
+    override_path = os.path.join(config_dir, OVERRIDE_DIR, f"gen{gen}.json")
+    if os.path.exists(override_path):
+        try:
+            override = _read(override_path)
+            merged = {} if override.get("replace", False) else dict(entries)
+            for entry in override.get("registers", []):
+                key = str(entry["key"])
+                if entry.get("remove", False):
+                    merged.pop(key, None)
+                else:
+                    merged[key] = {**merged.get(key, {}), **entry}
+            # Validate before using it
+            for entry in merged.values():
+                parse_register(entry)
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            _LOGGER.error("Ignoring register map %s: %s", override_path, err)
+        else:
+            entries, model = merged, override.get("model", model)
+            files.append(override_path)
+
+    return RegisterMap(
+        model=model,
+        descriptions=tuple(parse_register(entry) for entry in entries.values()),
+        tiers={key: entry["tier"] for key, entry in entries.items() if entry.get("tier") in TIERS},
+        files=tuple(files),
+    )
+
+async def async_get_register_map(hass: HomeAssistant, gen: int) -> RegisterMap:
+    """Return the map of a generation; only generations of configured devices are ever parsed."""
+    cache: Dict[int, RegisterMap] = hass.data.setdefault(f"{DOMAIN}_register_maps", {})
+    if gen not in cache:
+        cache[gen] = await hass.async_add_executor_job(load_register_map, gen, hass.config.config_dir)
+        _LOGGER.debug("Loaded %d registers for generation %s from %s", len(cache[gen].descriptions), gen, ", ".join(cache[gen].files))
+    return cache[gen]
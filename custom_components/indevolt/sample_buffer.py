@@ -0,0 +1,134 @@
+"""Bounded ring buffer of timestamped register samples, persisted in an append-only binary file."""
+from __future__ import annotations
+import logging
+import math
+import os
+import struct
+from array import array
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"IVSB\x01\x00\x00\x00"  # File format version 1
+RECORD = struct.Struct("<dId")  # timestamp (epoch s), register, value
+
+class SampleBuffer:
+    """Keep the last `capacity` samples in memory and on disk.
+
+    Samples are appended to the file in batches (see `take_flush_job`); the
+    file is compacted to the in-memory contents once it grows past twice the
+    capacity. File access is blocking and must run in the executor.
+    """
+
+    def __init__(self, path: str, capacity: int):
+        self.path = path
+        self.capacity = capacity
+        self._ts = array("d", [0.0]) * capacity
+        self._keys = array("I", [0]) * capacity
+        self._values = array("d", [0.0]) * capacity
+        self._head = 0  # Next write position
+        self.size = 0
+        self._pending = bytearray()
+        self._file_records = 0
+
+    def append(self, ts: float, values: Dict[str, float]) -> None:
+        """Add one sample per register, all taken at `ts`."""
+        for key, value in values.items():
+            self._put(ts, int(key), float(value))
+            self._pending += RECORD.pack(ts, int(key), float(value))
+
+    def _put(self, ts: float, key: int, value: float) -> None:
+        self._ts[self._head] = ts
+        self._keys[self._head] = key
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def __iter__(self) -> Iterator[Tuple[float, int, float]]:
+        """Iterate samples oldest first."""
+        return _iter_ring(self._ts, self._keys, self._values, self._head, self.size)
+
+    def snapshot(self) -> Callable[[], Iterator[Tuple[float, int, float]]]:
+        """Return a callable iterating a copy of the ring, safe to use in the executor."""
+        return partial(_iter_ring, self._ts[:], self._keys[:], self._values[:], self._head, self.size)
+
+    def load(self) -> None:
+        """Read the file into the ring (blocking, call before sampling starts)."""
+        try:
+            with open(self.path, "rb") as file:
+                raw = file.read()
+        except FileNotFoundError:
+            return
+        if not raw.startswith(MAGIC):
+            _LOGGER.warning("Ignoring sample buffer with unknown format: %s", self.path)
+            return
+        body = memoryview(raw)[len(MAGIC):]
+        count = len(body) // RECORD.size  # Drop a torn last record
+        first = max(0, count - self.capacity)
+        for ts, key, value in RECORD.iter_unpack(body[first * RECORD.size:count * RECORD.size]):
+            self._put(ts, key, value)
+        self._file_records = count
+
+    def take_flush_job(self) -> Callable[[], None] | None:
+        """Detach pending samples and return a blocking job that writes them.
+
+        Runs in the event loop; the returned job only touches copies, so it can
+        safely run in the executor while sampling continues.
+        """
+        if not self._pending:
+            return None
+        pending, self._pending = bytes(self._pending), bytearray()
+        count = len(pending) // RECORD.size
+        if self._file_records and self._file_records + count <= 2 * self.capacity:
+            self._file_records += count
+            return partial(self._append_file, pending)
+        # Compact: rewrite the file with the current ring contents
+        self._file_records = self.size
+        ring = (self._ts[:], self._keys[:], self._values[:], self._head, self.size)
+        return partial(self._rewrite_file, ring)
+
+    def _append_file(self, pending: bytes) -> None:
+        with open(self.path, "ab") as file:
+            file.write(pending)
+
+    def _rewrite_file(self, ring) -> None:
+        write_sample_file(self.path, _iter_ring(*ring))
+
+def write_sample_file(path: str, samples: Iterable[Tuple[float, int, float]]) -> None:
+    """Atomically write samples in the buffer file format (blocking)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC)
+        file.write(b"".join(RECORD.pack(*sample) for sample in samples))
+    os.replace(tmp_path, path)
+
+def _iter_ring(ts, keys, values, head: int, size: int) -> Iterator[Tuple[float, int, float]]:
+    capacity = len(ts)
+    start = (head - size) % capacity
+    for i in range(size):
+        idx = (start + i) % capacity
+        yield ts[idx], keys[idx], values[idx]
+
+def hourly_aggregates(
+    samples: Iterator[Tuple[float, int, float]], since: float, until: float
+) -> Dict[str, List[Tuple[float, float, float, float]]]:
+    """Aggregate samples in [since, until) into (hour start, mean, min, max) per register."""
+    buckets: Dict[Tuple[str, float], List[float]] = {}
+    for ts, key, value in samples:
+        if ts < since or ts >= until or math.isnan(value):
+            continue
+        hour = ts - ts % 3600
+        bucket = buckets.get((str(key), hour))
+        if bucket is None:
+            buckets[(str(key), hour)] = [value, value, value, 1]
+        else:
+            bucket[0] += value
+            bucket[1] = min(bucket[1], value)
+            bucket[2] = max(bucket[2], value)
+            bucket[3] += 1
+
+    result: Dict[str, List[Tuple[float, float, float, float]]] = {}
+    for (key, hour), (total, low, high, count) in sorted(buckets.items()):
+        result.setdefault(key, []).append((hour, total / count, low, high))
+    return result
@@ -0,0 +1,98 @@
+"""Per-device request scheduler: one request at a time, writes first, token-bucket rate limit."""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+PRIORITY_WRITE = 0
+PRIORITY_READ = 1
+_KINDS = {PRIORITY_WRITE: "write", PRIORITY_READ: "read"}
+
+class RequestScheduler:
+    """Serializes the requests to one device.
+
+    Waiting requests are granted by priority, then in arrival order, so a
+    write queued during a multi-batch read goes out before the next batch.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._waiting: list = []
+        self._seq = itertools.count()
+        self._busy = False
+        self.max_depth = 0
+        self.throttled = 0
+        self._stats = {kind: {"requests": 0, "wait_total": 0.0, "wait_max": 0.0} for kind in _KINDS.values()}
+
+    @property
+    def depth(self) -> int:
+        """Requests waiting for their turn."""
+        return sum(1 for _, _, future in self._waiting if not future.done())
+
+    @asynccontextmanager
+    async def slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for this device's turn (and a token), then hold it for one request."""
+        queued = time.monotonic()
+        if self._busy:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, (priority, next(self._seq), future))
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Cancelled right after being granted the slot: pass it on
+                if future.done() and not future.cancelled():
+                    self._release()
+                raise
+        else:
+            self._busy = True
+
+        try:
+            await self._take_token()
+            self._record(priority, time.monotonic() - queued)
+            yield
+        finally:
+            self._release()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Queue and wait-time metrics (wait times in ms)."""
+        result: Dict[str, Any] = {"max_depth": self.max_depth, "throttled": self.throttled}
+        for kind, stats in self._stats.items():
+            result[f"{kind}_requests"] = stats["requests"]
+            result[f"{kind}_wait_avg"] = round(stats["wait_total"] / stats["requests"] * 1000, 1) if stats["requests"] else None
+            result[f"{kind}_wait_max"] = round(stats["wait_max"] * 1000, 1)
+        return result
+
+    async def _take_token(self) -> None:
+        self._refill()
+        if self._tokens < 1:
+            self.throttled += 1
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+            self._refill()
+        self._tokens -= 1
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiting request, or mark the device idle."""
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._busy = False
+
+    def _record(self, priority: int, wait: float) -> None:
+        stats = self._stats[_KINDS[priority]]
+        stats["requests"] += 1
+        stats["wait_total"] += wait
+        stats["wait_max"] = max(stats["wait_max"], wait)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+import logging
+from homeassistant.components.select import SelectEntity
+from .const import DOMAIN, WORKING_MODES
+from .entity import IndevoltSettingEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities([IndevoltWorkingModeSelectEntity(coordinator)])
+
+class IndevoltWorkingModeSelectEntity(IndevoltSettingEntity, SelectEntity):
+    """Working mode (read from 7101, written through 47005)."""
+    _attr_options = list(WORKING_MODES)
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator, "working_mode", "Working Mode Control")
+
+    @property
+    def current_option(self):
+        # Modes not selectable here (e.g. outdoor portable) show as unknown
+        return next((option for option, mode in WORKING_MODES.items() if mode == self.raw_value), None)
+
+    async def async_select_option(self, option: str) -> None:
+        await self.async_write(WORKING_MODES[option])
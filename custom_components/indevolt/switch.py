@@ -0,0 +1,29 @@
+from __future__ import annotations
+import logging
+from homeassistant.components.switch import SwitchEntity
+from .const import DOMAIN
+from .entity import IndevoltSettingEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+SWITCHES = (
+    ("grid_charging", "Grid Charging"),
+    ("bypass_socket", "Bypass Socket"),
+    ("led_light", "LED Light"),
+)
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(IndevoltSettingSwitchEntity(coordinator, *switch) for switch in SWITCHES)
+
+class IndevoltSettingSwitchEntity(IndevoltSettingEntity, SwitchEntity):
+
+    @property
+    def is_on(self):
+        return bool(self.raw_value) if self.raw_value is not None else None
+
+    async def async_turn_on(self, **kwargs) -> None:
+        await self.async_write(1)
+
+    async def async_turn_off(self, **kwargs) -> None:
+        await self.async_write(0)
@@ -0,0 +1,81 @@
+"""Threshold rules with hysteresis, evaluated once per poll; only crossings produce events."""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import voluptuous as vol
+from homeassistant.helpers import config_validation as cv
+
+RULE_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Required("register"): vol.All(vol.Coerce(int), vol.Coerce(str)),
+        vol.Exclusive("above", "threshold"): vol.Coerce(float),
+        vol.Exclusive("below", "threshold"): vol.Coerce(float),
+        vol.Optional("hysteresis", default=0): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    }),
+    cv.has_at_least_one_key("above", "below"),
+)
+
+THRESHOLDS_SCHEMA = vol.Schema({cv.string: RULE_SCHEMA})
+
+@dataclass(frozen=True)
+class ThresholdRule:
+    name: str
+    register: str
+    threshold: float
+    above: bool  # Active at/above the threshold, otherwise at/below
+    hysteresis: float
+
+    def evaluate(self, value: float, active: Optional[bool]) -> bool:
+        """New state; between the threshold and threshold ∓ hysteresis the previous state is kept."""
+        if self.above:
+            if value >= self.threshold:
+                return True
+            return bool(active) and value > self.threshold - self.hysteresis
+        if value <= self.threshold:
+            return True
+        return bool(active) and value < self.threshold + self.hysteresis
+
+def parse_rules(config: Dict[str, Any]) -> List[ThresholdRule]:
+    rules = []
+    for name, rule in THRESHOLDS_SCHEMA(config or {}).items():
+        above = "above" in rule
+        rules.append(ThresholdRule(name, rule["register"], rule["above" if above else "below"], above, rule["hysteresis"]))
+    return rules
+
+class ThresholdMonitor:
+    """Keeps the state of every rule and reports the rules whose state changed."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.rules: List[ThresholdRule] = []
+        self._active: Dict[ThresholdRule, bool] = {}
+        self.configure(config)
+
+    @property
+    def keys(self) -> List[str]:
+        """Registers the rules need polled."""
+        return sorted({rule.register for rule in self.rules})
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """Replace the rules; unchanged rules keep their state so reconfiguring doesn't fire events."""
+        self.rules = parse_rules(config)
+        self._active = {rule: self._active[rule] for rule in self.rules if rule in self._active}
+
+    def update(self, data: Dict[str, Any]) -> List[tuple[ThresholdRule, bool, float]]:
+        """Evaluate all rules; return (rule, new state, value) for each crossing.
+
+        The first value a rule sees only establishes its state.
+        """
+        crossings = []
+        for rule in self.rules:
+            value = data.get(rule.register)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            previous = self._active.get(rule)
+            active = rule.evaluate(value, previous)
+            self._active[rule] = active
+            if previous is not None and active != previous:
+                crossings.append((rule, active, value))
+        return crossings
+
+    def as_dict(self) -> Dict[str, Optional[bool]]:
+        return {rule.name: self._active.get(rule) for rule in self.rules}
@@ -1,6 +1,26 @@
-def get_device_gen(str) -> int:
-    """Return the device generation."""
-    if str=="BK1600/BK1600Ultra":
-        return 1
-    else:
-        return 2
+from homeassistant.helpers.device_registry import DeviceInfo
+from .const import DOMAIN
+
+def get_device_gen(str) -> int:
+    """Return the device generation."""
+    if str=="BK1600/BK1600Ultra":
+        return 1
+    else:
+        return 2
+
+def get_entry_gen(entry) -> int:
+    """Return the device generation, preferring the detected capability profile over the model name."""
+    capabilities = entry.data.get("capabilities")
+    if capabilities:
+        return capabilities["gen"]
+    return get_device_gen(entry.data.get("device_model"))
+
+def get_device_info(entry) -> DeviceInfo:
+    """Return the device info shared by all entities of a config entry."""
+    sn = entry.data.get("sn", "unknown")
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry.entry_id)},
+        name=f"INDEVOLT {sn}",
+        model=entry.data.get("device_model"),
+        sw_version=entry.data.get("fw_version"),
+    )